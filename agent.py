@@ -1,106 +1,79 @@
 
-from langchain_groq import ChatGroq
-from langgraph.graph import StateGraph, START, END
-from typing import TypedDict, Optional
+# langchain_groq and langgraph are imported inside the factories below so
+# importing this module (as backend/api.py does) stays cheap
+from typing import TypedDict, Optional, Annotated
+from functools import lru_cache
+import operator
 import os
 from dotenv import load_dotenv
-import json
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from github_client import github_get, repo_path
+from llm_cache import llm_cache, make_key
+from notifications import send_email
+from telemetry import timed_node, LLM_SECONDS, LLM_TOKENS, LLM_CACHE_HITS
+from resilience import call_with_retries
+from anomaly import observe as observe_anomalies, describe as describe_anomaly, baseline_ready
 
 #model setup
 load_dotenv()
 
 
 
-# File paths
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-METRICS_FILE = os.path.join(BASE_DIR, "metrics_history.json")
+# metric history lives in storage.py (SQLite), re-exported here for callers
+from storage import (
+    load_previous_metrics,
+    load_history,
+    save_current_metrics,
+    save_fetch,
+    load_fresh_fetch,
+    upsert_daily_traffic,
+    METRICS_FILE
+)
 
-#loading
-def load_previous_metrics(repo_url: str):
-    if not os.path.exists(METRICS_FILE):
-        return None
+# seconds a fetched value stays good; GitHub only recomputes traffic
+# periodically while stars can change any minute (0 = always fetch)
+METRIC_TTLS = {
+    "stars": float(os.getenv("METRIC_TTL_STARS", "0")),
+    "views": float(os.getenv("METRIC_TTL_VIEWS", "3600")),
+    "clones": float(os.getenv("METRIC_TTL_CLONES", "3600")),
+}
 
-    with open(METRICS_FILE, "r") as f:
-        try:
-            data = json.load(f)
-            repo_data = data.get(repo_url)
-            
-            if not repo_data:
-                return None
-                
-            # Handle new list format vs old dict format
-            if isinstance(repo_data, list):
-                return repo_data[-1] if repo_data else None
-            return repo_data
-        except (json.JSONDecodeError, AttributeError):
-            return None
-
-def load_history(repo_url: str):
-    if not os.path.exists(METRICS_FILE):
-        return []
-
-    with open(METRICS_FILE, "r") as f:
-        try:
-            data = json.load(f)
-            repo_data = data.get(repo_url)
-            if isinstance(repo_data, list):
-                return repo_data
-            if repo_data:
-                return [repo_data]
-            return []
-        except:
-            return []
-
-def save_current_metrics(repo_url: str, metrics: dict):
-    data = {}
-    if os.path.exists(METRICS_FILE):
-        with open(METRICS_FILE, "r") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = {}
-    
-    # Initialize list if not present or convert old dict format
-    if repo_url not in data:
-        data[repo_url] = []
-    elif not isinstance(data[repo_url], list):
-        data[repo_url] = [data[repo_url]]
-        
-    data[repo_url].append(metrics)
-    
-    with open(METRICS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
 
+MODEL_NAME="llama-3.1-8b-instant"
+GROQ_HOST="api.groq.com"
+# seconds per completion request
+GROQ_TIMEOUT=float(os.getenv("GROQ_TIMEOUT", "30"))
+
+@lru_cache(maxsize=None)
+def get_model():
+    """The chat model, built on first use so read paths never need GROQ_API_KEY"""
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model=MODEL_NAME,
+        api_key=os.getenv("GROQ_API_KEY"),
+        timeout=GROQ_TIMEOUT,
+        # retries go through resilience.call_with_retries so they are counted
+        max_retries=0
+    )
 
-model = ChatGroq(
-    model="llama-3.1-8b-instant",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+# bump when a prompt template changes so memoized completions are not reused
+PROMPT_VERSIONS = {
+    "summary": "1",
+    "linkedin": "1",
+    "x": "1",
+    "combined": "1",
+}
+
+# "separate": summary then post (two calls); "combined": one structured call
+LLM_GENERATION_MODE = os.getenv("LLM_GENERATION_MODE", "separate")
 
 #keys setup
-SMTP_HOST=os.getenv("SMTP_HOST")
-SMTP_PORT=int(os.getenv("SMTP_PORT"))
-SMTP_USER=os.getenv("SMTP_USER")
-SMTP_PASS=os.getenv("SMTP_PASS")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 if not GITHUB_TOKEN:
     print("WARNING: GITHUB_TOKEN not found. Traffic metrics (views/clones) will fail for private repos and may be rate-limited for public ones.")
 
-headers = {
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "langgraph-agent"
-    }
-
-if GITHUB_TOKEN:
-    headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-
 
 
 #state of grpah setup
@@ -111,8 +84,15 @@ class Oldmetrics(TypedDict):
     uni_clone:int
     stars:int
 
+def merge_dicts(left:dict, right:dict) -> dict:
+    return {**(left or {}), **(right or {})}
+
 class Gitstate(TypedDict,total=False):
     repo_url:str
+    # deviations from the repo's rolling baseline found by persist_metrics
+    anomalies:list
+    # skip the LLM and email when nothing deviates from established baselines (batch syncs)
+    only_if_eventful:bool
     view:int
     clones:int
     unique_clone:int
@@ -122,88 +102,174 @@ class Gitstate(TypedDict,total=False):
     summary_ans:str
     social_type:str
     post:str
+    posts:dict
+    generation_mode:str
     status:str
+    # fetch nodes run as parallel branches, so errors from each are concatenated
+    fetch_errors:Annotated[list, operator.add]
+    # per metric: "fresh" (fetched this run), "reused" (within its TTL), "batched",
+    # or on error "failed" (worth retrying) / "unavailable" (see fetch_failed)
+    freshness:Annotated[dict, merge_dicts]
+    force_refresh:bool
+    # values already collected in bulk (e.g. GraphQL batch), keyed like the state
+    prefetched:dict
+    # leave notification to the caller (batched digest)
+    defer_email:bool
 
 
 #nodes
+def llm_transient(exc) -> bool:
+    """Timeouts, dropped connections and 5xx from the Groq client are worth a retry"""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    return (getattr(exc, "status_code", None) or 0) >= 500
+
+def invoke_model(kind: str, prompt: str, schema: dict = None):
+    """model.invoke timed per prompt kind, with the provider's token counts"""
+    model = get_model().with_structured_output(schema) if schema else get_model()
+
+    def attempt():
+        with LLM_SECONDS.labels(kind=kind).time():
+            return model.invoke(prompt)
+
+    response = call_with_retries(attempt, GROQ_HOST, llm_transient)
+    usage = getattr(response, "usage_metadata", None) or {}
+    for token_type in ("input_tokens", "output_tokens"):
+        if usage.get(token_type):
+            LLM_TOKENS.labels(kind=kind, type=token_type.split("_")[0]).inc(usage[token_type])
+    return response
+
+def cached_completion(kind: str, inputs, prompt: str) -> str:
+    """model.invoke memoized on (prompt kind/version, model, inputs)"""
+    key = make_key(kind, PROMPT_VERSIONS[kind], MODEL_NAME, inputs)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        print(f"Reusing memoized {kind} completion")
+        LLM_CACHE_HITS.labels(kind=kind).inc()
+        return cached
+    answer = invoke_model(kind, prompt).content
+    llm_cache.put(key, kind, answer)
+    return answer
+
+def fetch_failed(metric:str, e) -> dict:
+    """State update for a failed fetch.
+
+    A 4xx other than 429 (no push access to traffic, repo gone) won't fix
+    itself and is "unavailable"; rate limits, timeouts and 5xx are "failed".
+    """
+    print(f"Error fetching {metric}: {e}")
+    status = getattr(e, "status_code", None) or 0
+    outcome = "unavailable" if 400 <= status < 500 and status != 429 else "failed"
+    return {"fetch_errors": [f"{metric}: {e}"], "freshness": {metric: outcome}}
+
+
+def reuse_fresh(state:Gitstate, metric:str):
+    """State update from the last fetch of metric if still within its TTL"""
+    if state.get("force_refresh"):
+        return None
+    cached = load_fresh_fetch(state["repo_url"], metric, METRIC_TTLS[metric])
+    if cached is None:
+        return None
+    print(f"Reusing {metric} fetched within the last {METRIC_TTLS[metric]:.0f}s")
+    return {**cached, "freshness": {metric: "reused"}}
+
+def record_fetch(state:Gitstate, metric:str, values:dict) -> dict:
+    save_fetch(state["repo_url"], metric, values)
+    return {**values, "freshness": {metric: "fresh"}}
 
 
 def stars_checking(state:Gitstate) -> Gitstate:
+    if state.get("prefetched", {}).get("stars") is not None:
+        return {"stars": state["prefetched"]["stars"], "freshness": {"stars": "batched"}}
+    reused = reuse_fresh(state, "stars")
+    if reused:
+        return reused
     try:
-        recieving_url=state["repo_url"]
-        user=recieving_url.split("/")[-2]
-        repo=recieving_url.split("/")[-1]
-        print(f"--- Fetching stars for {user}/{repo} ---")
-
-        url=f"https://api.github.com/repos/{user}/{repo}"
-        response = requests.get(url, headers=headers)
-        data = response.json()
+        path=repo_path(state["repo_url"])
+        print(f"--- Fetching stars for {path} ---")
+
+        response = github_get(path)
+        response.raise_for_status()
+        data = response.data
         
-        state["stars"] = data.get("stargazers_count", 0)
-        print(f"Stars found: {state['stars']}")
+        stars = data.get("stargazers_count", 0)
+        print(f"Stars found: {stars}")
+        return record_fetch(state, "stars", {"stars": stars})
     except Exception as e:
-        print(f"Error fetching stars: {e}")
-        state["stars"] = 0
-    return state
+        return fetch_failed("stars", e)
     
 
 def clones_checking(state:Gitstate) -> Gitstate:
+    reused = reuse_fresh(state, "clones")
+    if reused:
+        return reused
     try:
-        recieving_url=state["repo_url"]
-        extracting_user=recieving_url.split("/")[-2]
-        extracting_repo=recieving_url.split("/")[-1]
-
-        traffic_url=f"https://api.github.com/repos/{extracting_user}/{extracting_repo}/traffic/clones"
-        response=requests.get(url=traffic_url,headers=headers)
-        response_json=response.json()
-
-        state["clones"] = response_json.get("count", 0)
-        state["unique_clone"] = response_json.get("uniques", 0)
+        traffic_path=f"{repo_path(state['repo_url'])}/traffic/clones"
+        response=github_get(traffic_path)
+        response.raise_for_status()
+        response_json=response.data
+        upsert_daily_traffic(state["repo_url"], "clones", response_json.get("clones", []))
+
+        return record_fetch(state, "clones", {
+            "clones": response_json.get("count", 0),
+            "unique_clone": response_json.get("uniques", 0)
+        })
     except Exception as e:
-        print(f"Error fetching clones: {e}")
-        state["clones"] = 0
-        state["unique_clone"] = 0
-    return state
+        return fetch_failed("clones", e)
 
 def traffic_views(state:Gitstate) -> Gitstate:
+    reused = reuse_fresh(state, "views")
+    if reused:
+        return reused
     try:
-        recieving_url=state["repo_url"]
-        extracting_user=recieving_url.split("/")[-2]
-        extracting_repo=recieving_url.split("/")[-1]
-
-        traffic_url=f"https://api.github.com/repos/{extracting_user}/{extracting_repo}/traffic/views"
-        response=requests.get(url=traffic_url,headers=headers)
-        response_json=response.json()
+        traffic_path=f"{repo_path(state['repo_url'])}/traffic/views"
+        response=github_get(traffic_path)
+        response.raise_for_status()
+        response_json=response.data
+        upsert_daily_traffic(state["repo_url"], "views", response_json.get("views", []))
         
-        state["view"] = response_json.get("count", 0)
-        state["unique_views"] = response_json.get("uniques", 0)
+        return record_fetch(state, "views", {
+            "view": response_json.get("count", 0),
+            "unique_views": response_json.get("uniques", 0)
+        })
     except Exception as e:
-        print(f"Error fetching views: {e}")
-        state["view"] = 0
-        state["unique_views"] = 0
-    return state
+        return fetch_failed("views", e)
 
-def llm_summary(state:Gitstate) -> Gitstate:
-    print("DEBUG: llm_summary node")
-    llm_input = {
-    "previous_period": state.get("previous_metrics", {
+def summary_input(state:Gitstate) -> dict:
+    return {
+    # the stored point's timestamp would make every run a cache miss
+    "previous_period": {k: v for k, v in state.get("previous_metrics", {
     "stars": 0,
     "views": 0,
     "uni_view": 0,
     "clone": 0,
-    "uni_clone": 0}),
+    "uni_clone": 0}).items() if k != "timestamp"},
 
     "current_period": {
-        "stars": state["stars"],
-        "views": state["view"],
-        "unique_visitors": state["unique_views"],
-        "clones": state["clones"],
-        "unique_cloners": state["unique_clone"],
+        "stars": state.get("stars", 0),
+        "views": state.get("view", 0),
+        "unique_visitors": state.get("unique_views", 0),
+        "clones": state.get("clones", 0),
+        "unique_cloners": state.get("unique_clone", 0),
         
-    }
+    },
+    # only present when something deviated, so uneventful runs keep their cache keys
+    **({"anomalies": [describe_anomaly(a) for a in state["anomalies"]]} if state.get("anomalies") else {})
 }
 
-    prompt=f''''
+def anomaly_note(llm_input:dict) -> str:
+    if not llm_input.get("anomalies"):
+        return ""
+    lines="\n".join(f"- {a}" for a in llm_input["anomalies"])
+    return f'''
+
+UNUSUAL ACTIVITY (deviates from this repo's usual pattern, lead the summary with it):
+{lines}'''
+
+def summary_prompt(llm_input:dict) -> str:
+    return f''''
 
     You are a technical growth analyst for open-source projects.
 
@@ -281,11 +347,78 @@ TONE:
 - Clear, precise, founder-to-founder
 - Analytical, not marketing
 - No emojis
-- No fluff'''
-    response=model.invoke(prompt)
-    answer=response.content
-    state["summary_ans"]=answer
-    return state
+- No fluff'''+anomaly_note(llm_input)
+
+def llm_summary(state:Gitstate) -> Gitstate:
+    print("DEBUG: llm_summary node")
+    llm_input=summary_input(state)
+    prompt=summary_prompt(llm_input)
+    answer=cached_completion("summary", llm_input, prompt)
+    return {"summary_ans": answer}
+
+
+COMBINED_SCHEMA = {
+    "title": "repo_growth_report",
+    "description": "Analytics summary plus LinkedIn and X posts written from it",
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string", "description": "The full analytics summary in the OUTPUT STRUCTURE above"},
+        "linkedin_post": {"type": "string", "description": "LinkedIn post based only on the summary"},
+        "x_post": {"type": "string", "description": "Single tweet based only on the summary"}
+    },
+    "required": ["summary", "linkedin_post", "x_post"]
+}
+
+def combined_prompt(llm_input:dict) -> str:
+    return summary_prompt(llm_input)+'''
+
+ADDITIONALLY, from that same summary write:
+
+linkedin_post:
+- First person ("I" / "we"), calm, reflective, professional
+- Short paragraphs: context, what changed and what it signals, a takeaway or next step
+- ~120–180 words, no emojis, no hype, at most 2–3 hashtags at the end
+- Do not invent metrics; use only what is in the summary
+
+x_post:
+- One or two short sentences, first person, plain text, under 200 characters
+- No emojis, at most 1 hashtag, no hype
+- Focus on insight or learning, not promotion
+
+Return summary, linkedin_post and x_post as the fields of a single JSON object.'''
+
+def valid_bundle(bundle) -> bool:
+    return isinstance(bundle, dict) and all(
+        isinstance(bundle.get(k), str) and bundle[k].strip() for k in COMBINED_SCHEMA["required"]
+    )
+
+def combined_generation(state:Gitstate) -> Gitstate:
+    """Summary, LinkedIn post and X post from one structured completion"""
+    llm_input=summary_input(state)
+    key = make_key("combined", PROMPT_VERSIONS["combined"], MODEL_NAME, llm_input)
+    bundle = llm_cache.get(key)
+    if bundle is not None:
+        LLM_CACHE_HITS.labels(kind="combined").inc()
+    else:
+        try:
+            bundle = invoke_model("combined", combined_prompt(llm_input), COMBINED_SCHEMA)
+        except Exception as e:
+            print(f"Structured generation failed: {e}")
+            bundle = None
+        if not valid_bundle(bundle):
+            # fall back to the two-call path rather than return a partial result
+            print("Structured output invalid, falling back to separate calls")
+            update = llm_summary(state)
+            post_node = generating_x_post if state.get("social_type")=="x" else generating_linkedin_post
+            update.update(post_node({**state, **update}))
+            return update
+        llm_cache.put(key, "combined", bundle)
+    posts = {"linkedin": bundle["linkedin_post"], "x": bundle["x_post"]}
+    return {
+        "summary_ans": bundle["summary"],
+        "posts": posts,
+        "post": posts.get(state.get("social_type"), bundle["linkedin_post"])
+    }
 
 
 def persist_metrics(state: Gitstate) -> Gitstate:
@@ -346,11 +479,9 @@ Return only the LinkedIn post text.
 
 
 '''
-    response=model.invoke(prompt)
-    linkedin_post=response.content
-    state["post"]=linkedin_post
+    linkedin_post=cached_completion("linkedin", state["summary_ans"], prompt)
 
-    return state
+    return {"post": linkedin_post}
 
 def generating_x_post(state:Gitstate) -> Gitstate:
     prompt=f'''You are a developer and founder sharing progress publicly on X (Twitter).
@@ -391,57 +522,85 @@ Return only the tweet text.
 
 
 '''
-    response=model.invoke(prompt)
-    x_tweet=response.content
-    state["post"]=x_tweet
+    x_tweet=cached_completion("x", state["summary_ans"], prompt)
 
-    return state
+    return {"post": x_tweet}
 
 def sending_email(state:Gitstate) -> Gitstate:
-    if not all([SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS]):
-        print("SMTP not configured, skipping email.")
-        state["status"] = "skipped_no_config"
-        return state
-        
-    try:
-        msg=MIMEMultipart()
-        msg["From"]=SMTP_USER
-        msg["To"]="digiance.sagarit@gmail.com"
-        msg["Subject"]="Daily Github Summary"
-        msg.attach(MIMEText(state.get("summary_ans", "No summary available"),"plain"))
-
-        server=smtplib.SMTP(SMTP_HOST, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
-        server.quit()
-        state["status"]="sent"
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        state["status"] = f"error: {str(e)}"
+    if state.get("defer_email"):
+        # a batch run (sync) sends one digest at the end instead
+        return {"status": "deferred"}
+    status=send_email("Daily Github Summary", state.get("summary_ans", "No summary available"))
+    return {"status": status}
+
+# state fields filled by each fetch node
+FETCH_FIELDS = {
+    "stars": ("stars",),
+    "views": ("view", "unique_views"),
+    "clones": ("clones", "unique_clone"),
+}
 
-    return state
+def fetch_incomplete(state) -> bool:
+    """A fetch failed in a way worth retrying, so the run has nothing to store"""
+    freshness = state.get("freshness", {})
+    return bool(state.get("fetch_errors")) and (not freshness or "failed" in freshness.values())
 
 def persist_metrics(state: Gitstate) -> Gitstate:
+    freshness = state.get("freshness", {})
+    if fetch_incomplete(state):
+        # a rate-limited or timed out fetch has no real value, don't record zeros for it
+        print(f"Not persisting metrics, fetch failed: {state['fetch_errors']}")
+        return {}
+    url = state.get("repo_url")
+    fetched = {
+        metric: {field: state.get(field, 0) for field in fields}
+        for metric, fields in FETCH_FIELDS.items() if freshness.get(metric) != "unavailable"
+    }
     try:
-        url = state.get("repo_url")
+        # unavailable metrics (e.g. traffic without push access) keep their last stored value
+        previous = {}
+        if len(fetched) < len(FETCH_FIELDS):
+            previous = load_previous_metrics(url) or {}
         current_metrics = {
-            "stars": state.get("stars", 0),
-            "view": state.get("view", 0),
-            "unique_views": state.get("unique_views", 0),
-            "clones": state.get("clones", 0),
-            "unique_clone": state.get("unique_clone", 0),
+            **{field: previous.get(field, 0) for fields in FETCH_FIELDS.values() for field in fields},
+            **{field: value for values in fetched.values() for field, value in values.items()},
             "timestamp": datetime.now().isoformat()
         }
         save_current_metrics(url, current_metrics)
     except Exception as e:
         print(f"Failed to persist metrics: {e}")
-    return state
-
-
-
+        return {}
+    try:
+        # only values fetched from GitHub this run move the baselines; a reused
+        # value was observed when it was fetched and would shrink the variance
+        observed = {
+            field: value for metric, values in fetched.items() if freshness.get(metric) != "reused"
+            for field, value in values.items()
+        }
+        anomalies = observe_anomalies(url, {**observed, "timestamp": current_metrics["timestamp"]})
+    except Exception as e:
+        print(f"Failed to update metric baselines: {e}")
+        return {}
+    if anomalies:
+        print(f"Anomalies for {url}: {[describe_anomaly(a) for a in anomalies]}")
+    return {"anomalies": anomalies}
+
+def generation_router(state:Gitstate) -> str:
+    if fetch_incomplete(state):
+        # nothing was fetched, don't summarize or post zeros
+        return "skip"
+    if state.get("only_if_eventful") and not state.get("anomalies") and baseline_ready(state["repo_url"]):
+        # nothing unusual, no summary, post or email for this repo;
+        # until the baselines are built every run is summarized
+        return "skip"
+    if state.get("generation_mode", LLM_GENERATION_MODE)=="combined":
+        return "combined"
+    return "summary"
 
 def router(state:Gitstate) -> str:
+    if state.get("post"):
+        # combined generation already wrote the post
+        return "done"
     if state["social_type"]=="linkedin":
         return "linkedin"
     elif state["social_type"]=="x":
@@ -450,45 +609,113 @@ def router(state:Gitstate) -> str:
         return "error"
     
 
-#building the graph
-graph=StateGraph(Gitstate)
-graph.add_node("stars",stars_checking)
-graph.add_node("traffic",traffic_views)
-graph.add_node("summary",llm_summary)
-graph.add_node("clones",clones_checking)
-graph.add_node("linkedin_post",generating_linkedin_post)
-graph.add_node("x_post",generating_x_post)
-graph.add_node("sending_mail",sending_email)
-graph.add_node("persist_metrics", persist_metrics)
-
-
-
-graph.add_edge(START, "stars")
-graph.add_edge("stars","traffic")
-graph.add_edge("traffic","clones")
-graph.add_edge("clones","summary")
-graph.add_edge("summary", "persist_metrics")
-graph.add_edge("persist_metrics", "sending_mail")
-graph.add_conditional_edges(
-    "sending_mail",
-    router,
-    {
-        "linkedin":"linkedin_post",
-        "x":"x_post",
-        "error":END
-        
-    }
+#building the graphs
+def add_node(graph, name, fn):
+    # every run of the node lands in the per-node latency histogram
+    graph.add_node(name, timed_node(name, fn))
+
+def add_fetch_stage(graph):
+    from langgraph.graph import START
+    # the three fetches are independent, so fan them out from START;
+    # whatever comes next joins on all three branches
+    add_node(graph,"stars",stars_checking)
+    add_node(graph,"traffic",traffic_views)
+    add_node(graph,"clones",clones_checking)
+    graph.add_edge(START, "stars")
+    graph.add_edge(START, "traffic")
+    graph.add_edge(START, "clones")
+    return ["stars","traffic","clones"]
+
+def add_post_stage(graph, after):
+    from langgraph.graph import END
+    add_node(graph,"linkedin_post",generating_linkedin_post)
+    add_node(graph,"x_post",generating_x_post)
+    graph.add_conditional_edges(
+        after,
+        router,
+        {
+            "linkedin":"linkedin_post",
+            "x":"x_post",
+            "error":END,
+            "done":END
+            
+        }
 
-)
-graph.add_edge("linkedin_post",END)
-graph.add_edge("x_post",END)
+    )
+    graph.add_edge("linkedin_post",END)
+    graph.add_edge("x_post",END)
+
+
+
+def add_generation_stage(graph, after):
+    # one structured call or summary-then-post, picked per run
+    from langgraph.graph import END
+    add_node(graph,"summary",llm_summary)
+    add_node(graph,"combined",combined_generation)
+    graph.add_conditional_edges(
+        after,
+        generation_router,
+        {
+            "summary":"summary",
+            "combined":"combined",
+            "skip":END
+        }
+    )
+    return ["summary","combined"]
+
+
+# compiled graphs are built once, on first use
+
+@lru_cache(maxsize=None)
+def get_metrics_app():
+    """Metrics only: fetch + persist, no LLM or email (read paths)"""
+    from langgraph.graph import StateGraph, END
+    metrics_graph=StateGraph(Gitstate)
+    add_node(metrics_graph,"persist_metrics", persist_metrics)
+    metrics_graph.add_edge(add_fetch_stage(metrics_graph),"persist_metrics")
+    metrics_graph.add_edge("persist_metrics",END)
+    return metrics_graph.compile()
+
+@lru_cache(maxsize=None)
+def get_summary_app():
+    """Summary + social post from metrics already in the state"""
+    from langgraph.graph import StateGraph, START, END
+    summary_graph=StateGraph(Gitstate)
+    add_generation_stage(summary_graph,START)
+    add_post_stage(summary_graph,"summary")
+    summary_graph.add_edge("combined",END)
+    return summary_graph.compile()
+
+@lru_cache(maxsize=None)
+def get_app():
+    """Full run: fetch -> persist -> summary -> email -> post"""
+    from langgraph.graph import StateGraph
+    graph=StateGraph(Gitstate)
+    add_node(graph,"persist_metrics", persist_metrics)
+    add_node(graph,"sending_mail",sending_email)
+    graph.add_edge(add_fetch_stage(graph),"persist_metrics")
+    for node in add_generation_stage(graph,"persist_metrics"):
+        graph.add_edge(node,"sending_mail")
+    add_post_stage(graph,"sending_mail")
+    return graph.compile()
+
+_LAZY_ATTRS = {
+    "app": get_app,
+    "metrics_app": get_metrics_app,
+    "summary_app": get_summary_app,
+    "model": get_model,
+}
 
-app=graph.compile()
+def __getattr__(name):
+    # keeps `from agent import app` working without building anything at import
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     previous_metrics = load_previous_metrics()
 
-    result = app.invoke(
+    result = get_app().invoke(
         {
             "repo_url": "your_repo",
             "social_type":"x/linkedin",
@@ -0,0 +1,117 @@
+"""
+Streaming spike detection for repo metrics.
+
+Each (repo, metric) keeps an exponentially weighted mean and variance in
+the metric_stats table, updated in O(1) every time a snapshot is
+persisted, so nothing rescans history. A new value is flagged when it is
+more than ANOMALY_Z standard deviations from the running mean, and
+ANOMALY_MIN_DELTA away in absolute terms, once at least
+ANOMALY_MIN_SAMPLES values have been seen.
+
+Stars are tracked as new stars per day since the previous snapshot
+(the total only ever climbs, and snapshots come at irregular times);
+snapshots less than ANOMALY_MIN_INTERVAL apart are folded into the next
+one. The traffic counts are GitHub's rolling 14-day totals and are
+tracked as levels. Each update is one SQLite write transaction, so the
+collector and a manual sync persisting the same repo can't lose one.
+"""
+
+import os
+import math
+from datetime import datetime
+
+from storage import update_metric_stats, load_metric_stats
+from telemetry import ANOMALIES
+
+ANOMALY_ALPHA = float(os.getenv("ANOMALY_ALPHA", "0.1"))
+ANOMALY_Z = float(os.getenv("ANOMALY_Z", "3"))
+ANOMALY_MIN_SAMPLES = int(os.getenv("ANOMALY_MIN_SAMPLES", "8"))
+ANOMALY_MIN_DELTA = float(os.getenv("ANOMALY_MIN_DELTA", "5"))
+# seconds between snapshots below which a star rate isn't meaningful
+ANOMALY_MIN_INTERVAL = float(os.getenv("ANOMALY_MIN_INTERVAL", "600"))
+
+# metric -> "rate" (change per day between snapshots) or "level" (the value itself)
+TRACKED_METRICS = {
+    "stars": "rate",
+    "view": "level",
+    "unique_views": "level",
+    "clones": "level",
+    "unique_clone": "level"
+}
+
+
+def update(stat: dict, x: float, alpha: float = ANOMALY_ALPHA):
+    """Fold x into {count, mean, var}; returns (new stat, deviation from the old mean, z-score)"""
+    count, mean, var = stat["count"], stat["mean"], stat["var"]
+    diff = x - mean
+    if count == 0:
+        return {**stat, "count": 1, "mean": float(x), "var": 0.0}, 0.0, 0.0
+    std = math.sqrt(var)
+    z = diff / std if std > 0 else (math.inf if diff else 0.0)
+    incr = alpha * diff
+    return {**stat, "count": count + 1, "mean": mean + incr, "var": (1 - alpha) * (var + diff * incr)}, diff, z
+
+
+def observe(repo_url: str, metrics: dict) -> list:
+    """Update the rolling stats with one snapshot, returns the anomalies it contains"""
+    at = datetime.fromisoformat(metrics["timestamp"]) if metrics.get("timestamp") else datetime.now()
+    anomalies = []
+
+    def apply(stats):
+        anomalies.clear()
+        for metric, mode in TRACKED_METRICS.items():
+            value = metrics.get(metric)
+            if value is None:
+                continue
+            stat = stats.get(metric) or {"count": 0, "mean": 0.0, "var": 0.0, "last_value": None, "last_at": None}
+            if mode == "rate":
+                if stat["last_value"] is None or not stat.get("last_at"):
+                    # first snapshot, nothing to diff against yet
+                    stats[metric] = {**stat, "last_value": value, "last_at": at.isoformat()}
+                    continue
+                elapsed = (at - datetime.fromisoformat(stat["last_at"])).total_seconds()
+                if elapsed < ANOMALY_MIN_INTERVAL:
+                    # too close to the last snapshot, its change counts towards the next one
+                    continue
+                change = value - stat["last_value"]
+                x = change * 86400 / elapsed
+            else:
+                x = value
+            expected = stat["mean"]
+            seen = stat["count"]
+            stat, diff, z = update(stat, x)
+            stats[metric] = {**stat, "last_value": value, "last_at": at.isoformat()}
+            if seen >= ANOMALY_MIN_SAMPLES and abs(diff) >= ANOMALY_MIN_DELTA and abs(z) >= ANOMALY_Z:
+                direction = "spike" if diff > 0 else "drop"
+                ANOMALIES.labels(metric=metric, direction=direction).inc()
+                anomaly = {
+                    "metric": metric,
+                    "value": round(x, 1),
+                    "expected": round(expected, 1),
+                    "z": round(z, 1) if math.isfinite(z) else None,
+                    "direction": direction
+                }
+                if mode == "rate":
+                    anomaly.update({"change": change, "hours": round(elapsed / 3600, 1)})
+                anomalies.append(anomaly)
+        return stats
+
+    update_metric_stats(repo_url, apply)
+    return anomalies
+
+
+def baseline_ready(repo_url: str) -> bool:
+    """Enough snapshots seen for at least one metric to be flagged"""
+    stats = load_metric_stats(repo_url)
+    return any(stats.get(m, {}).get("count", 0) >= ANOMALY_MIN_SAMPLES for m in TRACKED_METRICS)
+
+
+def describe(anomaly: dict) -> str:
+    """One line for emails and prompts"""
+    if anomaly["metric"] == "stars":
+        return (
+            f"{anomaly['direction']} in new stars: {anomaly['change']} in {anomaly['hours']}h "
+            f"({anomaly['value']}/day vs ~{anomaly['expected']}/day expected)"
+        )
+    label = anomaly["metric"].replace("_", " ")
+    return f"{anomaly['direction']} in {label}: {anomaly['value']} vs ~{anomaly['expected']} expected"
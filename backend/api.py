@@ -3,7 +3,7 @@ Flask API wrapper for the GitHub Tracker Agent
 Provides REST endpoints for the frontend to interact with the agent
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import sys
 import os
@@ -11,15 +11,48 @@ import os
 # Add parent directory to path to import agent
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# graphs are built lazily on first use, importing agent doesn't need
+# LLM or SMTP credentials
 from agent import (
-    app as agent_app,
+    get_app,
+    get_metrics_app,
+    get_summary_app,
+    sending_email,
+    fetch_incomplete,
     load_previous_metrics,
     save_current_metrics,
-    load_history,
-    Gitstate,
-    METRICS_FILE
+    Gitstate
 )
-import requests
+from storage import (
+    delete_repo_metrics,
+    load_recent_metrics,
+    load_fetches,
+    save_fetch,
+    load_daily_traffic,
+    sum_daily_traffic,
+    query_history,
+    load_repo_summaries,
+    load_commit_cursor,
+    query_commits,
+    commit_date,
+    load_star_backfill,
+    load_star_series
+)
+from commit_ingest import ingest_commits
+from star_backfill import backfill_stars
+from repo_metadata import fetch_repo_metadata
+from github_cache import response_cache
+from llm_cache import llm_cache
+from rate_limit import rate_limiter, graphql_rate_limiter
+from sync_jobs import SyncJobManager
+from collector import Collector
+from registry import RepoRegistry
+from notifications import send_digest, send_alert
+from anomaly import describe as describe_anomaly
+from resilience import breaker_status
+import telemetry
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import json
 from datetime import datetime
 
@@ -30,26 +63,61 @@ CORS(app)  # Enable CORS for frontend communication
 # Store connected repositories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 REPOS_FILE = os.path.join(BASE_DIR, "connected_repos.json")
+# stars, traffic views and clones, commits
+GITHUB_CALLS_PER_REPO = 4
 
-def load_repos():
-    """Load connected repositories from file"""
-    if not os.path.exists(REPOS_FILE):
-        return []
-    with open(REPOS_FILE, 'r') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
+# cap on points per /api/history response
+HISTORY_MAX_POINTS = int(os.getenv("HISTORY_MAX_POINTS", "1000"))
+HISTORY_RESOLUTIONS = ("raw", "hour", "day")
+COMMITS_DEFAULT_LIMIT = 30
+COMMITS_MAX_LIMIT = 100
+# 1 = sync only summarizes and emails repos whose metrics deviated (off: every repo)
+ANOMALY_GATING = os.getenv("ANOMALY_GATING", "0") == "1"
+# seconds between collector alert emails for the same repo
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", "21600"))
+
+sync_jobs = SyncJobManager()
+# one stargazer backfill at a time, it parallelizes its own page fetches
+star_backfills = ThreadPoolExecutor(max_workers=1, thread_name_prefix="star-backfill")
+star_backfills_running = set()
+star_backfills_lock = threading.Lock()
+# parsed once, indexed by id and url; reloaded only when the file changes
+registry = RepoRegistry(REPOS_FILE)
+# repo url -> time of the last collector alert
+last_alerts = {}
+last_alerts_lock = threading.Lock()
 
-def save_repos(repos):
-    """Save connected repositories to file"""
-    with open(REPOS_FILE, 'w') as f:
-        json.dump(repos, f, indent=2)
+def load_repos():
+    """All connected repositories"""
+    return registry.all()
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
+    return jsonify({
+        "status": "healthy",
+        "github_cache": response_cache.stats(),
+        "github_rate_limit": rate_limiter.status(),
+        "llm_cache": llm_cache.stats(),
+        "collector": collector.status(),
+        "circuit_breakers": breaker_status(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@telemetry.REGISTRY.on_collect
+def collect_rate_limits():
+    """Quota gauges are read from the limiters at scrape time, nothing on the request path"""
+    for resource, limiter in (("core", rate_limiter), ("graphql", graphql_rate_limiter)):
+        status = limiter.status()
+        if status["remaining"] is not None:
+            telemetry.RATE_LIMIT_REMAINING.labels(resource=resource).set(status["remaining"])
+        if status["limit"] is not None:
+            telemetry.RATE_LIMIT_LIMIT.labels(resource=resource).set(status["limit"])
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text exposition of node, GitHub, LLM, storage and SMTP timings"""
+    return Response(telemetry.render(), content_type=telemetry.CONTENT_TYPE)
 
 @app.route('/api/repos', methods=['GET'])
 def get_repos():
@@ -100,23 +168,11 @@ def add_repo():
     except Exception as e:
          return jsonify({"error": f"Failed to parse URL: {str(e)}"}), 400
     
-    repos = load_repos()
-    
-    # Check if repo already exists
-    if any(r['url'] == repo_url for r in repos):
-        return jsonify({"error": "Repository already connected"}), 400
-    
-    new_repo = {
-        "id": len(repos) + 1,
-        "url": repo_url,
-        "owner": owner,
-        "name": name,
-        "added_at": datetime.now().isoformat(),
-        "last_checked": None
-    }
-    
-    repos.append(new_repo)
-    save_repos(repos)
+    try:
+        # ids are never reused, even after a delete
+        new_repo = registry.add(repo_url, owner, name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     return jsonify({"repo": new_repo}), 201
 
@@ -124,60 +180,69 @@ def add_repo():
 def delete_repo(repo_id):
     """Remove a repository from tracking"""
     try:
-        repos = load_repos()
-        repo_to_delete = next((r for r in repos if int(r['id']) == repo_id), None)
+        repo_to_delete = registry.remove(repo_id)
         
         if not repo_to_delete:
              return jsonify({"error": "Repository not found"}), 404
-             
-        repos = [r for r in repos if int(r['id']) != repo_id]
-        save_repos(repos)
         
         # Also remove from metrics history
-        if os.path.exists(METRICS_FILE):
-            with open(METRICS_FILE, 'r') as f:
-                try:
-                    data = json.load(f)
-                    if repo_to_delete['url'] in data:
-                        del data[repo_to_delete['url']]
-                        with open(METRICS_FILE, 'w') as f_out:
-                            json.dump(data, f_out, indent=2)
-                except:
-                    pass
+        delete_repo_metrics(repo_to_delete['url'])
                     
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def stored_metrics(repo, **extra):
+    """/api/metrics response from the latest stored points, None if nothing is stored"""
+    recent = load_recent_metrics(repo['url'], 2)
+    if not recent:
+        return None
+    current = recent[0]
+    return {
+        "repo": repo,
+        "current": {
+            "stars": current['stars'],
+            "views": current['view'],
+            "unique_views": current['unique_views'],
+            "clones": current['clones'],
+            "unique_clones": current['unique_clone']
+        },
+        "previous": recent[1] if len(recent) > 1 else None,
+        "source": "store",
+        "timestamp": current['timestamp'],
+        **extra
+    }
+
 @app.route('/api/metrics/<int:repo_id>', methods=['GET'])
 def get_metrics(repo_id):
     """Get current metrics for a repository"""
-    repos = load_repos()
-    repo = next((r for r in repos if r['id'] == repo_id), None)
+    repo = registry.get(repo_id)
     
     if not repo:
         return jsonify({"error": "Repository not found"}), 404
     
+    # Serve the collector's data while it is fresh, no GitHub call at all
+    if collector.is_fresh(repo):
+        stored = stored_metrics(repo)
+        if stored:
+            return jsonify(stored)
+
     # Get previous metrics
     previous_metrics = load_previous_metrics(repo['url'])
     
-    # Run the agent to get current metrics
+    # Fetch and persist current metrics only, no LLM summary or email
     try:
-        result = agent_app.invoke({
-            "repo_url": repo['url'],
-            "social_type": "linkedin",  # Default to linkedin
-            "previous_metrics": previous_metrics or {
-                "stars": 0,
-                "views": 0,
-                "uni_view": 0,
-                "clone": 0,
-                "uni_clone": 0
-            }
-        })
+        result = get_metrics_app().invoke({"repo_url": repo['url']})
+        if fetch_incomplete(result):
+            # nothing was fetched, answer with the last stored point rather than zeros
+            stored = stored_metrics(repo, fetch_errors=result['fetch_errors'])
+            if stored:
+                return jsonify(stored)
+            return jsonify({"error": f"GitHub fetch failed: {'; '.join(result['fetch_errors'])}"}), 503
         
-        # Update last checked time
+        # Update last checked time, written back with the next batch
         repo['last_checked'] = datetime.now().isoformat()
-        save_repos(repos)
+        registry.mark_checked({repo['id']: repo['last_checked']})
         
         return jsonify({
             "repo": repo,
@@ -189,7 +254,8 @@ def get_metrics(repo_id):
                 "unique_clones": result.get('unique_clone', 0)
             },
             "previous": previous_metrics,
-            "summary": result.get('summary_ans', ''),
+            "source": "github",
+            "freshness": result.get('freshness', {}),
             "timestamp": datetime.now().isoformat()
         })
     except Exception as e:
@@ -198,20 +264,29 @@ def get_metrics(repo_id):
 @app.route('/api/summary/<int:repo_id>', methods=['POST'])
 def generate_summary(repo_id):
     """Generate AI summary for a repository"""
-    repos = load_repos()
-    repo = next((r for r in repos if r['id'] == repo_id), None)
+    repo = registry.get(repo_id)
     
     if not repo:
         return jsonify({"error": "Repository not found"}), 404
     
     data = request.json
     social_type = data.get('social_type', 'linkedin')  # 'linkedin' or 'x'
+    notify = bool(data.get('notify', False))  # also email the summary
+    mode = data.get('mode')  # 'combined' or 'separate', defaults to LLM_GENERATION_MODE
     
     previous_metrics = load_previous_metrics(repo['url'])
     
     try:
-        result = agent_app.invoke({
-            "repo_url": repo['url'],
+        metrics = get_metrics_app().invoke({"repo_url": repo['url']})
+        fetch_errors = None
+        if fetch_incomplete(metrics):
+            # summarize the last stored point rather than zeros
+            fetch_errors = metrics['fetch_errors']
+            if not previous_metrics:
+                return jsonify({"error": f"GitHub fetch failed: {'; '.join(fetch_errors)}"}), 503
+            metrics = {"repo_url": repo['url'], **{k: v for k, v in previous_metrics.items() if k != 'timestamp'}}
+        inputs = {
+            **metrics,
             "social_type": social_type,
             "previous_metrics": previous_metrics or {
                 "stars": 0,
@@ -220,128 +295,413 @@ def generate_summary(repo_id):
                 "clone": 0,
                 "uni_clone": 0
             }
-        })
+        }
+        if mode:
+            inputs["generation_mode"] = mode
+        result = get_summary_app().invoke(inputs)
         
-        return jsonify({
+        response = {
             "summary": result.get('summary_ans', ''),
             "post": result.get('post', ''),
             "social_type": social_type,
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        if result.get('posts'):
+            # combined mode returns both variants for free
+            response["posts"] = result['posts']
+        if fetch_errors:
+            response["fetch_errors"] = fetch_errors
+        if notify:
+            response["email_status"] = sending_email(result).get('status')
+        return jsonify(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def sse(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/summary/<int:repo_id>/stream', methods=['GET'])
+def stream_summary(repo_id):
+    """Stream the AI summary and post token by token as server-sent events.
+
+    Uses the latest stored snapshot when there is one (pass fresh=1 to
+    fetch from GitHub first) so the LLM starts right away.
+    """
+    repo = registry.get(repo_id)
+    
+    if not repo:
+        return jsonify({"error": "Repository not found"}), 404
+    
+    social_type = request.args.get('social_type', 'linkedin')
+    fresh = request.args.get('fresh') == '1'
+    mode = request.args.get('mode')
+
+    def generate():
+        try:
+            recent = load_recent_metrics(repo['url'], 2)
+            if fresh or not recent:
+                yield sse("node", {"stage": "metrics", "node": "start"})
+                for update in get_metrics_app().stream({"repo_url": repo['url'], "force_refresh": True}, stream_mode="updates"):
+                    for node in update:
+                        yield sse("node", {"stage": "metrics", "node": node})
+                recent = load_recent_metrics(repo['url'], 2)
+            if not recent:
+                yield sse("error", {"message": "No metrics available for this repository"})
+                return
+
+            current = recent[0]
+            previous = recent[1] if len(recent) > 1 else {
+                "stars": 0, "views": 0, "uni_view": 0, "clone": 0, "uni_clone": 0
+            }
+            inputs = {
+                "repo_url": repo['url'],
+                "social_type": social_type,
+                "previous_metrics": previous,
+                "stars": current['stars'],
+                "view": current['view'],
+                "unique_views": current['unique_views'],
+                "clones": current['clones'],
+                "unique_clone": current['unique_clone']
+            }
+            if mode:
+                inputs["generation_mode"] = mode
+            yield sse("metrics", {"current": current, "previous": previous})
+
+            for stream_mode, chunk in get_summary_app().stream(inputs, stream_mode=["updates", "messages"]):
+                if stream_mode == "messages":
+                    message, metadata = chunk
+                    if message.content:
+                        yield sse("token", {"node": metadata.get("langgraph_node"), "text": message.content})
+                    continue
+                for node, update in chunk.items():
+                    yield sse("node", {"stage": "summary", "node": node})
+                    # memoized completions arrive here without any tokens
+                    if update and update.get("summary_ans"):
+                        yield sse("summary", {"text": update["summary_ans"]})
+                    if update and update.get("post"):
+                        yield sse("post", {"text": update["post"], "social_type": social_type})
+                    if update and update.get("posts"):
+                        yield sse("posts", update["posts"])
+            yield sse("done", {"timestamp": datetime.now().isoformat()})
+        except Exception as e:
+            yield sse("error", {"message": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def format_growth(window):
+    """7-day star growth as the short label shown on repo cards"""
+    if not window:
+        return "n/a"
+    if window['pct'] is None:
+        return f"{window['delta']:+d}"
+    return f"{window['pct']:+.1f}%"
+
 @app.route('/api/dashboard', methods=['GET'])
 def get_dashboard_data():
     """Get aggregated dashboard data for all repos"""
     repos = load_repos()
-    
-    total_stars = 0
-    total_views = 0
-    total_clones = 0
     repo_data = []
 
-    metrics_history = {}
-    if os.path.exists(METRICS_FILE):
-        with open(METRICS_FILE, 'r') as f:
-            try:
-                metrics_history = json.load(f)
-            except:
-                pass
+    # latest values and per-repo trends are maintained on write by storage
+    summaries = load_repo_summaries(r['url'] for r in repos)
+    # forks/watchers/open issues from the last batched metadata fetch
+    metadata = load_fetches((r['url'] for r in repos), "metadata")
 
     for repo in repos:
-        metrics = metrics_history.get(repo['url'], [])
-        
-        # Handle list vs dict
-        if isinstance(metrics, dict):
-             metrics = [metrics]
-             
-        latest = metrics[-1] if metrics else {}
-        
-        stars = latest.get('stars', 0)
-        views = latest.get('view', 0)
-        clones = latest.get('clones', 0)
-        
-        total_stars += stars
-        total_views += views
-        total_clones += clones
+        summary = summaries.get(repo['url'], {})
+        growth = summary.get('growth', {})
         
         repo_data.append({
             **repo,
-            "stars": stars,
-            "views": views,
-            "clones": clones,
-            "growth": "+5%" # Placeholder for trend logic
+            "stars": summary.get('stars', 0),
+            "views": summary.get('views', 0),
+            "clones": summary.get('clones', 0),
+            "forks": metadata.get(repo['url'], {}).get('forks', 0),
+            "watchers": metadata.get(repo['url'], {}).get('watchers', 0),
+            "open_issues": metadata.get(repo['url'], {}).get('open_issues', 0),
+            "growth": format_growth(growth.get('stars', {}).get('7d')),
+            "trends": growth
         })
 
+    # totals cover the registered repos only, whatever else is in the store
     return jsonify({
         "total_repos": len(repos),
-        "total_stars": total_stars,
-        "total_views": total_views,
-        "total_clones": total_clones,
+        "total_stars": sum(s['stars'] for s in summaries.values()),
+        "total_views": sum(s['views'] for s in summaries.values()),
+        "total_clones": sum(s['clones'] for s in summaries.values()),
         "repos": repo_data,
-        "last_updated": datetime.now().isoformat()
+        "last_updated": max((s['timestamp'] for s in summaries.values()), default=None) or datetime.now().isoformat()
+    })
+
+def prefetch_metadata(repos):
+    """Sync prepare step: stars, forks, watchers and open issues in GraphQL batches"""
+    metadata = fetch_repo_metadata(r['url'] for r in repos)
+    for url, values in metadata.items():
+        save_fetch(url, "metadata", values)
+    return metadata
+
+def sync_repo(repo, metadata=None):
+    """Run the agent for one repo, returns (status, message, extra) for the job entry"""
+    retry_at = rate_limiter.deferred_until()
+    if retry_at:
+        # quota is gone until the reset, don't write zeros for the rest
+        return "deferred", "GitHub rate limit exhausted", {
+            "retry_at": datetime.fromtimestamp(retry_at).isoformat()
+        }
+
+    previous_metrics = load_previous_metrics(repo['url'])
+    result = get_app().invoke({
+        "repo_url": repo['url'],
+        "social_type": "linkedin",
+        "prefetched": (metadata or {}).get(repo['url'], {}),
+        "defer_email": True,
+        "only_if_eventful": ANOMALY_GATING,
+        "previous_metrics": previous_metrics or {
+            "stars": 0, "views": 0, "uni_view": 0, "clone": 0, "uni_clone": 0
+        }
     })
+    if fetch_incomplete(result):
+        return "error", "; ".join(result['fetch_errors']), {}
+    ingest_commits_quietly(repo['url'])
+    # unavailable metrics (no traffic access) are reported but don't fail the repo
+    return "success", "; ".join(result.get('fetch_errors', [])) or None, {
+        "checked_at": datetime.now().isoformat(),
+        "freshness": result.get('freshness', {}),
+        "anomalies": result.get('anomalies', []),
+        # underscore keys stay out of the progress endpoint
+        "_summary": result.get('summary_ans', '')
+    }
+
+def mark_checked(checked):
+    """Write back last_checked for {repo_id: timestamp}"""
+    registry.mark_checked(checked)
+
+def finish_sync(job):
+    """Write back last_checked and email one digest for the repos the job synced"""
+    synced = [entry for entry in job.repos.values() if entry['status'] == 'success']
+    mark_checked({entry['repo_id']: entry['checked_at'] for entry in synced})
+    # with gating on, uneventful repos have no summary and stay out of the digest
+    job.email_status = send_digest([
+        {
+            "repo": entry['repo'],
+            "summary": entry.get('_summary'),
+            "anomalies": [describe_anomaly(a) for a in entry.get('anomalies', [])]
+        }
+        for entry in synced if entry.get('_summary') or entry.get('anomalies')
+    ])
+
+def ingest_commits_quietly(repo_url):
+    """Commit ingestion alongside a metrics run, a failure there doesn't fail the run"""
+    try:
+        ingest_commits(repo_url)
+    except Exception as e:
+        print(f"Error ingesting commits for {repo_url}: {e}")
+
+def alert_anomalies(repo, anomalies):
+    """Email a collector-found anomaly, at most once per ALERT_COOLDOWN per repo"""
+    now = datetime.now().timestamp()
+    with last_alerts_lock:
+        if now - last_alerts.get(repo['url'], 0) < ALERT_COOLDOWN:
+            return
+        last_alerts[repo['url']] = now
+    send_alert(f"{repo['owner']}/{repo['name']}", [describe_anomaly(a) for a in anomalies])
+
+def collect_repo(repo):
+    """Collector job: fetch and persist metrics and new commits, no LLM"""
+    result = get_metrics_app().invoke({"repo_url": repo['url']})
+    if result.get('fetch_errors'):
+        print(f"Collector: {repo['url']}: {'; '.join(result['fetch_errors'])}")
+    if fetch_incomplete(result):
+        return False
+    if result.get('anomalies'):
+        alert_anomalies(repo, result['anomalies'])
+    ingest_commits_quietly(repo['url'])
+    return True
+
+def load_repo_stars(repos):
+    summaries = load_repo_summaries(r['url'] for r in repos)
+    return {r['id']: summaries.get(r['url'], {}).get('stars', 0) for r in repos}
+
+collector = Collector(
+    load_repos, collect_repo, mark_checked, rate_limiter,
+    calls_per_repo=GITHUB_CALLS_PER_REPO, load_stars=load_repo_stars
+)
+# started with the app, whichever server imports it; under the debug
+# reloader only the serving child collects, not the watcher process
+if os.getenv("COLLECTOR_ENABLED") == "1" and (__name__ != '__main__' or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+    collector.start()
 
 @app.route('/api/sync', methods=['POST'])
 def sync_all():
-    """Manually trigger sync for all repositories"""
+    """Start a background sync of all repositories, returns a job id to poll"""
     repos = load_repos()
-    results = []
-    
-    for repo in repos:
-        try:
-            previous_metrics = load_previous_metrics(repo['url'])
-            agent_app.invoke({
-                "repo_url": repo['url'],
-                "social_type": "linkedin",
-                "previous_metrics": previous_metrics or {
-                    "stars": 0, "views": 0, "uni_view": 0, "clone": 0, "uni_clone": 0
-                }
-            })
-            repo['last_checked'] = datetime.now().isoformat()
-            results.append({"repo": repo['name'], "status": "success"})
-        except Exception as e:
-            results.append({"repo": repo['name'], "status": "error", "message": str(e)})
-    
-    save_repos(repos)
-    return jsonify({"results": results})
+    job = sync_jobs.submit(repos, sync_repo, on_complete=finish_sync, prepare=prefetch_metadata)
+    # stars come from the GraphQL batches, so each repo costs the traffic and commit calls
+    job.estimated_finish = rate_limiter.estimate_finish(len(repos) * (GITHUB_CALLS_PER_REPO - 1)).isoformat()
+    return jsonify({
+        "job_id": job.id,
+        "total": len(repos),
+        "estimated_finish": job.estimated_finish,
+        "rate_limit": rate_limiter.status()
+    }), 202
+
+@app.route('/api/sync/<job_id>', methods=['GET'])
+def sync_progress(job_id):
+    """Progress of a sync job with per-repo status and timings"""
+    job = sync_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Sync job not found"}), 404
+    return jsonify({**job.to_dict(), "rate_limit": rate_limiter.status()})
 
 @app.route('/api/history/<int:repo_id>', methods=['GET'])
 def get_repo_history(repo_id):
-    """Get metric history for charts"""
-    repos = load_repos()
-    repo = next((r for r in repos if r['id'] == repo_id), None)
+    """Get metric history for charts.
+
+    Query params: from / to (ISO timestamps, to is exclusive), resolution
+    (raw, hour or day) and limit (newest points kept). When a page is
+    full, X-Next-To holds the `to` value for the next, older page.
+    """
+    repo = registry.get(repo_id)
+    if not repo:
+        return jsonify({"error": "Repository not found"}), 404
+
+    resolution = request.args.get('resolution', 'raw')
+    if resolution not in HISTORY_RESOLUTIONS:
+        return jsonify({"error": f"resolution must be one of {', '.join(HISTORY_RESOLUTIONS)}"}), 400
+    try:
+        limit = min(int(request.args.get('limit', HISTORY_MAX_POINTS)), HISTORY_MAX_POINTS)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    history = query_history(
+        repo['url'],
+        start=request.args.get('from'),
+        end=request.args.get('to'),
+        resolution=resolution,
+        limit=limit
+    )
+    response = jsonify(history)
+    if len(history) == limit:
+        response.headers['X-Next-To'] = history[0]['timestamp']
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-To'
+    return response
+
+@app.route('/api/history/<int:repo_id>/daily', methods=['GET'])
+def get_daily_traffic(repo_id):
+    """Per-day views/clones series and range totals (from/to as YYYY-MM-DD)"""
+    repo = registry.get(repo_id)
     if not repo:
         return jsonify({"error": "Repository not found"}), 404
-        
-    history = load_history(repo['url'])
-    return jsonify(history)
+
+    start = request.args.get('from')
+    end = request.args.get('to')
+    return jsonify({
+        "series": load_daily_traffic(repo['url'], start, end),
+        "totals": sum_daily_traffic(repo['url'], start, end)
+    })
+
+@app.route('/api/history/<int:repo_id>/stars', methods=['GET'])
+def get_star_history(repo_id):
+    """Daily new and cumulative stars from the stargazer backfill (from/to as YYYY-MM-DD)"""
+    repo = registry.get(repo_id)
+    if not repo:
+        return jsonify({"error": "Repository not found"}), 404
+
+    return jsonify({
+        "series": load_star_series(repo['url'], request.args.get('from'), request.args.get('to')),
+        "backfill": load_star_backfill(repo['url'])
+    })
+
+def run_star_backfill(repo):
+    try:
+        result = backfill_stars(repo['url'])
+        print(f"Star backfill for {repo['url']}: {result['status']}, {result['pages_done']}/{result['total_pages']} pages")
+    except Exception as e:
+        print(f"Star backfill failed for {repo['url']}: {e}")
+    finally:
+        with star_backfills_lock:
+            star_backfills_running.discard(repo['id'])
+
+@app.route('/api/stars/<int:repo_id>/backfill', methods=['POST'])
+def start_star_backfill(repo_id):
+    """Start (or resume) the stargazer history backfill in the background"""
+    repo = registry.get(repo_id)
+    if not repo:
+        return jsonify({"error": "Repository not found"}), 404
+
+    with star_backfills_lock:
+        if repo_id in star_backfills_running:
+            return jsonify({"error": "Backfill already running", "backfill": load_star_backfill(repo['url'])}), 409
+        star_backfills_running.add(repo_id)
+    star_backfills.submit(run_star_backfill, repo)
+    return jsonify({"backfill": load_star_backfill(repo['url']) or {"status": "queued"}}), 202
+
+@app.route('/api/stars/<int:repo_id>/backfill', methods=['GET'])
+def star_backfill_progress(repo_id):
+    """Checkpointed pages so far, updated while the backfill runs"""
+    repo = registry.get(repo_id)
+    if not repo:
+        return jsonify({"error": "Repository not found"}), 404
+
+    with star_backfills_lock:
+        running = repo_id in star_backfills_running
+    return jsonify({"running": running, "backfill": load_star_backfill(repo['url'])})
 
 @app.route('/api/commits/<int:repo_id>', methods=['GET'])
 def get_repo_commits(repo_id):
-    """Get recent commits for timeline"""
-    repos = load_repos()
-    repo = next((r for r in repos if r['id'] == repo_id), None)
+    """Commit timeline served from the local store.
+
+    Query params: author (GitHub login or git author name), since / until
+    (ISO timestamps, until is exclusive), limit and cursor. When a page is
+    full, X-Next-Cursor holds the cursor for the next, older page.
+    refresh=1 pulls new commits from GitHub first.
+    """
+    repo = registry.get(repo_id)
     if not repo:
         return jsonify({"error": "Repository not found"}), 404
 
-    # Fetch commits via GitHub API
     try:
-        url = f"https://api.github.com/repos/{repo['owner']}/{repo['name']}/commits?per_page=5"
-        # Optional: Use token if available to avoid rate limits
-        token = os.getenv("GITHUB_TOKEN")
-        headers = {"User-Agent": "git-tracker"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-            
-        resp = requests.get(url, headers=headers)
-        if resp.status_code == 200:
-            return jsonify(resp.json())
-        return jsonify([])
-    except Exception as e:
-        print(f"Error fetching commits: {e}")
-        return jsonify([])
+        limit = min(int(request.args.get('limit', COMMITS_DEFAULT_LIMIT)), COMMITS_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    before = None
+    if request.args.get('cursor'):
+        committed_at, _, sha = request.args['cursor'].rpartition('|')
+        if not committed_at or not sha:
+            return jsonify({"error": "invalid cursor"}), 400
+        before = (committed_at, sha)
+
+    # the collector and syncs keep the store current, only a repo that was
+    # never ingested (or an explicit refresh) costs a GitHub call here
+    if request.args.get('refresh') == '1' or load_commit_cursor(repo['url']) is None:
+        try:
+            ingest_commits(repo['url'])
+        except Exception as e:
+            print(f"Error ingesting commits: {e}")
+
+    commits = query_commits(
+        repo['url'],
+        author=request.args.get('author'),
+        since=request.args.get('since'),
+        until=request.args.get('until'),
+        limit=limit,
+        before=before
+    )
+    response = jsonify(commits)
+    if len(commits) == limit:
+        last = commits[-1]
+        response.headers['X-Next-Cursor'] = f"{commit_date(last)}|{last['sha']}"
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+    return response
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
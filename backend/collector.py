@@ -0,0 +1,178 @@
+"""
+Background metric collection.
+
+The Collector wakes up every COLLECT_TICK seconds and collects metrics
+(fetch + persist, no LLM or email) for repos whose data is older than
+COLLECT_INTERVAL. Each repo's due time carries random jitter so work
+spreads out instead of bursting at the top of the hour, and due repos
+are taken most-stale and most-starred first. A run never exceeds
+COLLECT_CONCURRENCY repos at once or COLLECT_MAX_CALLS_PER_HOUR GitHub
+calls, and pauses while the shared rate limiter is out of quota.
+A repo whose collection fails backs off exponentially before it is
+picked again, so a repo that keeps failing can't hog the first slot.
+"""
+
+import os
+import math
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+COLLECT_INTERVAL = float(os.getenv("COLLECT_INTERVAL", "3600"))
+COLLECT_TICK = float(os.getenv("COLLECT_TICK", "30"))
+# due times are spread by +/- this fraction of the interval
+COLLECT_JITTER = float(os.getenv("COLLECT_JITTER", "0.1"))
+COLLECT_CONCURRENCY = int(os.getenv("COLLECT_CONCURRENCY", "2"))
+COLLECT_MAX_CALLS_PER_HOUR = int(os.getenv("COLLECT_MAX_CALLS_PER_HOUR", "2000"))
+# after a failed collection a repo waits base * 2**(failures - 1) seconds, at most max
+COLLECT_RETRY_BASE = float(os.getenv("COLLECT_RETRY_BASE", "60"))
+COLLECT_RETRY_MAX = float(os.getenv("COLLECT_RETRY_MAX", str(COLLECT_INTERVAL)))
+
+
+def _age(repo: dict, now: float) -> float:
+    """Seconds since the repo was last collected, inf if never"""
+    if not repo.get('last_checked'):
+        return math.inf
+    try:
+        return now - datetime.fromisoformat(repo['last_checked']).timestamp()
+    except ValueError:
+        return math.inf
+
+
+class Collector:
+    def __init__(self, load_repos, collect_repo, mark_checked, rate_limiter,
+                 calls_per_repo: int, load_stars=None):
+        """
+        load_repos() -> list of repo dicts
+        collect_repo(repo) -> True when fresh metrics were stored
+        mark_checked({repo_id: iso timestamp}) writes back last_checked
+        load_stars(repos) -> {repo_id: stars}, used to weight importance
+        """
+        self.load_repos = load_repos
+        self.collect_repo = collect_repo
+        self.mark_checked = mark_checked
+        self.rate_limiter = rate_limiter
+        self.calls_per_repo = calls_per_repo
+        self.load_stars = load_stars or (lambda repos: {})
+        self.interval = COLLECT_INTERVAL
+        self.concurrency = COLLECT_CONCURRENCY
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="collect")
+        self._running = set()
+        self._calls = deque()  # timestamps of repo runs in the last hour
+        self._offsets = {}
+        # repo_id -> (consecutive failures, time of the last attempt)
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.collected = 0
+        self.failed = 0
+
+    def _offset(self, repo_id) -> float:
+        if repo_id not in self._offsets:
+            self._offsets[repo_id] = random.uniform(-COLLECT_JITTER, COLLECT_JITTER) * self.interval
+        return self._offsets[repo_id]
+
+    def _retry_at(self, repo_id) -> float:
+        """Earliest time a failing repo may be tried again, 0 if it isn't failing"""
+        if repo_id not in self._failures:
+            return 0.0
+        failures, attempted_at = self._failures[repo_id]
+        return attempted_at + min(COLLECT_RETRY_BASE * 2 ** (failures - 1), COLLECT_RETRY_MAX)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_fresh(self, repo: dict) -> bool:
+        """The collector is keeping this repo's stored metrics current"""
+        return self.running and _age(repo, time.time()) < self.interval
+
+    def pick(self, repos, now: float):
+        """Due repos, most urgent first"""
+        stars = self.load_stars(repos)
+        due = []
+        for repo in repos:
+            if repo['id'] in self._running or now < self._retry_at(repo['id']):
+                continue
+            age = _age(repo, now)
+            if age < self.interval + self._offset(repo['id']):
+                continue
+            staleness = min(age, 30 * self.interval) / self.interval
+            importance = 1 + math.log1p(stars.get(repo['id'], 0))
+            due.append((staleness * importance, repo))
+        due.sort(key=lambda item: item[0], reverse=True)
+        return [repo for _, repo in due]
+
+    def _budget(self, now: float) -> int:
+        """Repos that may still start within the hourly call budget"""
+        while self._calls and now - self._calls[0] > 3600:
+            self._calls.popleft()
+        return COLLECT_MAX_CALLS_PER_HOUR // self.calls_per_repo - len(self._calls)
+
+    def tick(self):
+        """Start collection for as many due repos as the limits allow"""
+        if self.rate_limiter.deferred_until():
+            return
+        now = time.time()
+        with self._lock:
+            slots = min(self.concurrency - len(self._running), self._budget(now))
+            if slots <= 0:
+                return
+            batch = self.pick(self.load_repos(), now)[:slots]
+            for repo in batch:
+                self._running.add(repo['id'])
+                self._calls.append(now)
+        for repo in batch:
+            self._executor.submit(self._run, repo)
+
+    def _run(self, repo):
+        try:
+            ok = self.collect_repo(repo)
+        except Exception as e:
+            print(f"Collector failed for {repo['url']}: {e}")
+            ok = False
+        with self._lock:
+            self._running.discard(repo['id'])
+            # new jitter for the next round
+            self._offsets.pop(repo['id'], None)
+            if ok:
+                self.collected += 1
+                self._failures.pop(repo['id'], None)
+            else:
+                self.failed += 1
+                failures = self._failures.get(repo['id'], (0, 0))[0]
+                self._failures[repo['id']] = (failures + 1, time.time())
+        if ok:
+            self.mark_checked({repo['id']: datetime.now().isoformat()})
+
+    def _loop(self):
+        while not self._stop.wait(COLLECT_TICK):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Collector tick failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="collector", daemon=True)
+            self._thread.start()
+            print(f"Collector started: every {self.interval:.0f}s, {self.concurrency} at a time")
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.running,
+                "interval": self.interval,
+                "running": len(self._running),
+                "runs_last_hour": len(self._calls),
+                "collected": self.collected,
+                "failed": self.failed,
+                "backing_off": len(self._failures)
+            }
@@ -0,0 +1,182 @@
+"""
+In-memory registry of connected repositories.
+
+connected_repos.json is parsed once and kept in memory with id and url
+indexes, so looking a repo up is a dict access instead of a file parse
+plus a linear scan. The file is re-read only when its mtime or size
+changes (someone edited it by hand).
+
+Ids come from a persisted next_id counter and are never reused after a
+delete. Adding or removing a repo is written back straight away;
+last_checked updates are batched and flushed at most every
+REPOS_FLUSH_DELAY seconds. Every write goes to a temp file that
+replaces the real one, so readers never see a half written file.
+
+File format: {"next_id": 4, "repos": [...]}. The old plain list is still
+read and converted on the next write.
+"""
+
+import os
+import json
+import atexit
+import threading
+from datetime import datetime
+
+from telemetry import STORAGE_SECONDS
+
+REPOS_FLUSH_DELAY = float(os.getenv("REPOS_FLUSH_DELAY", "2"))
+
+
+class RepoRegistry:
+    def __init__(self, path: str, flush_delay: float = REPOS_FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.version = 0
+        self._repos = {}  # id -> repo, in insertion order
+        self._by_url = {}
+        self._next_id = 1
+        self._signature = None
+        self._dirty = False
+        # last_checked values not yet on disk, re-applied if the file is reloaded
+        self._pending_checked = {}
+        self._timer = None
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
+    # -- loading
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        """Reload from disk if the file changed since we last read or wrote it"""
+        signature = self._stat()
+        if signature == self._signature:
+            return
+        with STORAGE_SECONDS.labels(op="repos_reload").time():
+            data = []
+            if signature is not None:
+                with open(self.path, "r") as f:
+                    try:
+                        data = json.load(f)
+                    except json.JSONDecodeError:
+                        print(f"Could not parse {self.path}, keeping the repos in memory")
+                        self._signature = signature
+                        return
+            repos = data.get("repos", []) if isinstance(data, dict) else data
+            self._repos = {int(r["id"]): r for r in repos}
+            self._by_url = {r["url"]: r for r in repos}
+            max_id = max(self._repos, default=0)
+            next_id = data.get("next_id", 0) if isinstance(data, dict) else 0
+            self._next_id = max(next_id, max_id + 1, self._next_id)
+            for repo_id, checked in self._pending_checked.items():
+                if repo_id in self._repos:
+                    self._repos[repo_id]["last_checked"] = checked
+            self._signature = signature
+            self.version += 1
+
+    # -- reads, each a copy so callers can't change the registry by accident
+
+    def all(self) -> list:
+        with self._lock:
+            self._refresh()
+            return [dict(r) for r in self._repos.values()]
+
+    def get(self, repo_id: int):
+        with self._lock:
+            self._refresh()
+            repo = self._repos.get(repo_id)
+            return dict(repo) if repo else None
+
+    def get_by_url(self, url: str):
+        with self._lock:
+            self._refresh()
+            repo = self._by_url.get(url)
+            return dict(repo) if repo else None
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._repos)
+
+    # -- writes
+
+    def add(self, url: str, owner: str, name: str) -> dict:
+        """Register a repo under a fresh id, ValueError if the url is already tracked"""
+        with self._lock:
+            self._refresh()
+            if url in self._by_url:
+                raise ValueError("Repository already connected")
+            repo = {
+                "id": self._next_id,
+                "url": url,
+                "owner": owner,
+                "name": name,
+                "added_at": datetime.now().isoformat(),
+                "last_checked": None
+            }
+            self._next_id += 1
+            self._repos[repo["id"]] = repo
+            self._by_url[url] = repo
+            self.version += 1
+            self._write()
+            return dict(repo)
+
+    def remove(self, repo_id: int):
+        """Drop a repo, returns it or None if it wasn't registered"""
+        with self._lock:
+            self._refresh()
+            repo = self._repos.pop(repo_id, None)
+            if repo is None:
+                return None
+            self._by_url.pop(repo["url"], None)
+            self._pending_checked.pop(repo_id, None)
+            self.version += 1
+            self._write()
+            return repo
+
+    def mark_checked(self, checked: dict):
+        """Set last_checked for {repo_id: iso timestamp}, written back in the next batch"""
+        if not checked:
+            return
+        with self._lock:
+            self._refresh()
+            for repo_id, timestamp in checked.items():
+                repo = self._repos.get(repo_id)
+                if repo is not None:
+                    repo["last_checked"] = timestamp
+                    self._pending_checked[repo_id] = timestamp
+            self.version += 1
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write pending changes now"""
+        with self._lock:
+            if self._dirty:
+                # pick up hand edits first, pending last_checked values are re-applied
+                self._refresh()
+                self._write()
+
+    def _write(self):
+        with STORAGE_SECONDS.labels(op="repos_write").time():
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"next_id": self._next_id, "repos": list(self._repos.values())}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        # our own write must not trigger a reload
+        self._signature = self._stat()
+        self._dirty = False
+        self._pending_checked.clear()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
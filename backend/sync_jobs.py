@@ -0,0 +1,155 @@
+"""
+Background sync jobs for the Flask API.
+
+POST /api/sync hands the repo list to a SyncJobManager and returns a job
+id straight away. Repos are processed on a bounded thread pool
+(SYNC_CONCURRENCY workers) and the job keeps per-repo status and timings
+for the progress endpoint.
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "4"))
+# finished jobs kept around for the progress endpoint
+SYNC_JOBS_KEPT = int(os.getenv("SYNC_JOBS_KEPT", "20"))
+
+
+class SyncJob:
+    def __init__(self, repos):
+        self.id = uuid.uuid4().hex
+        self.created_at = datetime.now().isoformat()
+        self.finished_at = None
+        self.estimated_finish = None
+        self.email_status = None
+        self.repos = {
+            repo['id']: {
+                "repo_id": repo['id'],
+                "repo": repo['name'],
+                "status": "queued",
+                "started_at": None,
+                "finished_at": None,
+                "duration_ms": None,
+                "message": None
+            }
+            for repo in repos
+        }
+        self._pending = len(self.repos)
+        self._completed = False
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        """Every repo finished and the completion step (the digest) has run"""
+        return self._completed
+
+    def complete(self, on_complete=None):
+        """Run on_complete(job) and only then mark the job done; its errors land in email_status"""
+        if on_complete:
+            try:
+                on_complete(self)
+            except Exception as e:
+                print(f"Sync completion step failed for job {self.id}: {e}")
+                self.email_status = f"error: {e}"
+        with self._lock:
+            self.finished_at = datetime.now().isoformat()
+            self._completed = True
+
+    def start_repo(self, repo_id):
+        with self._lock:
+            entry = self.repos[repo_id]
+            entry["status"] = "running"
+            entry["started_at"] = datetime.now().isoformat()
+            entry["_t0"] = time.perf_counter()
+
+    def finish_repo(self, repo_id, status: str, message: str = None, **extra) -> bool:
+        """Record a repo's outcome, returns True for the last repo of the job"""
+        with self._lock:
+            entry = self.repos[repo_id]
+            t0 = entry.pop("_t0", None)
+            entry["status"] = status
+            entry["message"] = message
+            entry["finished_at"] = datetime.now().isoformat()
+            if t0 is not None:
+                entry["duration_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            entry.update(extra)
+            self._pending -= 1
+            return self._pending == 0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            repos = [
+                {k: v for k, v in entry.items() if not k.startswith("_")}
+                for entry in self.repos.values()
+            ]
+            counts = {}
+            for entry in repos:
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+            return {
+                "job_id": self.id,
+                "state": "done" if self.done else "running",
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "estimated_finish": self.estimated_finish,
+                "email_status": self.email_status,
+                "total": len(repos),
+                "counts": counts,
+                "repos": repos
+            }
+
+
+class SyncJobManager:
+    def __init__(self, max_workers: int = SYNC_CONCURRENCY):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, repos, run_repo, on_complete=None, prepare=None) -> SyncJob:
+        """Queue run_repo(repo, context) for every repo; on_complete(job) runs once at the end,
+        before the job reports done.
+
+        run_repo returns (status, message, extra fields) for the progress entry.
+        prepare(repos), if given, runs first on the pool and its return value
+        is the context handed to every run_repo call.
+        """
+        job = SyncJob(repos)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j for j in self._jobs.values() if j.done and j is not job]
+            for old in finished[:max(len(finished) - SYNC_JOBS_KEPT, 0)]:
+                del self._jobs[old.id]
+
+        if not repos:
+            job.complete(on_complete)
+
+        def task(repo, context):
+            job.start_repo(repo['id'])
+            try:
+                status, message, extra = run_repo(repo, context)
+            except Exception as e:
+                status, message, extra = "error", str(e), {}
+            if job.finish_repo(repo['id'], status, message, **extra):
+                job.complete(on_complete)
+
+        def kickoff():
+            context = None
+            if prepare:
+                try:
+                    context = prepare(repos)
+                except Exception as e:
+                    print(f"Sync prepare step failed: {e}")
+            for repo in repos:
+                self._executor.submit(task, repo, context)
+
+        if repos:
+            self._executor.submit(kickoff)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
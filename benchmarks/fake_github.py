@@ -0,0 +1,278 @@
+"""
+Local stand-in for the GitHub REST and GraphQL APIs.
+
+Serves the endpoints the tracker uses (repo, traffic views/clones,
+commits, stargazers, GraphQL repository batches) with deterministic per-repo data,
+ETags that answer If-None-Match with 304, X-RateLimit-* headers backed
+by a real quota window, and configurable per-request latency. Runs on
+the stdlib http.server so it needs nothing beyond Python itself.
+
+    server = FakeGitHub(latency=0.02).start()
+    os.environ["GITHUB_API_URL"] = server.url
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+REPO_RE = re.compile(r"^/repos/([^/]+)/([^/]+)(/.*)?$")
+ALIAS_RE = re.compile(r"\br(\d+):\s*repository\(")
+
+
+def _seed(owner: str, name: str) -> int:
+    return zlib.crc32(f"{owner}/{name}".encode())
+
+
+def repo_payload(owner: str, name: str) -> dict:
+    seed = _seed(owner, name)
+    return {
+        "full_name": f"{owner}/{name}",
+        "stargazers_count": seed % 5000,
+        "forks_count": seed % 700,
+        "subscribers_count": seed % 90,
+        "open_issues_count": seed % 40
+    }
+
+
+def traffic_payload(owner: str, name: str, kind: str, days: int = 14) -> dict:
+    seed = _seed(owner, name)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    points = []
+    for i in range(days):
+        count = (seed >> (i % 16)) % 200
+        points.append({
+            "timestamp": (today - timedelta(days=days - 1 - i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "count": count,
+            "uniques": count // 3
+        })
+    return {
+        "count": sum(p["count"] for p in points),
+        "uniques": sum(p["uniques"] for p in points),
+        kind: points
+    }
+
+
+def commits_payload(owner: str, name: str, count: int) -> list:
+    now = datetime.now(timezone.utc)
+    commits = []
+    for i in range(count):
+        sha = hashlib.sha1(f"{owner}/{name}/{i}".encode()).hexdigest()
+        date = (now - timedelta(hours=6 * i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        commits.append({
+            "sha": sha,
+            "html_url": f"https://github.com/{owner}/{name}/commit/{sha}",
+            "commit": {
+                "message": f"Commit {i} on {name}",
+                "author": {"name": f"dev{i % 3}", "email": f"dev{i % 3}@example.com", "date": date}
+            },
+            "author": {"login": f"dev{i % 3}"}
+        })
+    return commits
+
+
+def stargazers_payload(owner: str, name: str, page: int, per_page: int) -> list:
+    """One page of stargazers, oldest first, one star every ~3 hours back from now"""
+    total = repo_payload(owner, name)["stargazers_count"]
+    start = datetime.now(timezone.utc) - timedelta(hours=3 * total)
+    first = (page - 1) * per_page
+    return [
+        {
+            "starred_at": (start + timedelta(hours=3 * i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user": {"login": f"user{i}"}
+        }
+        for i in range(first, min(first + per_page, total))
+    ]
+
+
+def graphql_node(owner: str, name: str) -> dict:
+    repo = repo_payload(owner, name)
+    return {
+        "stargazerCount": repo["stargazers_count"],
+        "forkCount": repo["forks_count"],
+        "watchers": {"totalCount": repo["subscribers_count"]},
+        "issues": {"totalCount": repo["open_issues_count"]}
+    }
+
+
+class Quota:
+    """A GitHub style rate-limit window"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = time.time() + window
+        self._lock = threading.Lock()
+
+    def take(self, cost: int = 1):
+        """Charge cost, returns (allowed, headers)"""
+        with self._lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.remaining = self.limit
+                self.reset_at = now + self.window
+            allowed = self.remaining >= cost
+            if allowed:
+                self.remaining -= cost
+            headers = {
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Remaining": str(self.remaining),
+                "X-RateLimit-Reset": str(int(self.reset_at)),
+                "X-RateLimit-Used": str(self.limit - self.remaining)
+            }
+            return allowed, headers
+
+
+class FakeGitHub:
+    def __init__(self, latency: float = 0.02, jitter: float = 0.0, rate_limit: int = 5000,
+                 graphql_limit: int = 5000, window: float = 3600, commits: int = 30,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        latency/jitter: seconds added to every request (jitter is +/- uniform)
+        rate_limit/graphql_limit: requests per window before 403s
+        commits: commits listed per repo
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rest_quota = Quota(rate_limit, window)
+        self.graphql_quota = Quota(graphql_limit, window)
+        self.commits = commits
+        self.requests = 0
+        self.not_modified = 0
+        self.limited = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-github", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "not_modified": self.not_modified, "rate_limited": self.limited}
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _sleep(self):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def route(self, path: str, query: str):
+        """(status, payload) or (status, payload, headers) for a REST GET"""
+        match = REPO_RE.match(path)
+        if not match:
+            return 404, {"message": "Not Found"}
+        owner, name, rest = match.group(1), match.group(2), match.group(3) or ""
+        if rest == "/stargazers":
+            args = parse_qs(query)
+            page = int(args.get("page", ["1"])[0])
+            per_page = int(args.get("per_page", ["30"])[0])
+            last = -(-repo_payload(owner, name)["stargazers_count"] // per_page)
+            link = f'<{self.url}{path}?per_page={per_page}&page={last}>; rel="last"'
+            return 200, stargazers_payload(owner, name, page, per_page), {"Link": link}
+        if rest == "":
+            return 200, repo_payload(owner, name)
+        if rest == "/traffic/views":
+            return 200, traffic_payload(owner, name, "views")
+        if rest == "/traffic/clones":
+            return 200, traffic_payload(owner, name, "clones")
+        if rest == "/commits":
+            return 200, commits_payload(owner, name, self.commits)
+        return 404, {"message": "Not Found"}
+
+    def graphql(self, body: dict):
+        variables = body.get("variables") or {}
+        data = {}
+        for alias in ALIAS_RE.findall(body.get("query", "")):
+            owner, name = variables.get(f"o{alias}"), variables.get(f"n{alias}")
+            data[f"r{alias}"] = graphql_node(owner, name) if owner and name else None
+        return {"data": data}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, payload=None, headers=None):
+                body = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def _limited(self, headers):
+                fake._count("limited")
+                self._reply(403, {"message": "API rate limit exceeded"}, headers)
+
+            def do_GET(self):
+                fake._count("requests")
+                fake._sleep()
+                parsed = urlparse(self.path)
+                status, payload, *extra = fake.route(parsed.path, parsed.query)
+                etag = '"%s"' % hashlib.md5(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    # conditional hits don't count against GitHub's quota
+                    _, headers = fake.rest_quota.take(0)
+                    fake._count("not_modified")
+                    self._reply(304, None, {**headers, "ETag": etag})
+                    return
+                allowed, headers = fake.rest_quota.take()
+                if not allowed:
+                    self._limited(headers)
+                    return
+                if status == 200:
+                    headers["ETag"] = etag
+                if extra:
+                    headers.update(extra[0])
+                self._reply(status, payload, headers)
+
+            def do_POST(self):
+                fake._count("requests")
+                fake._sleep()
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._reply(400, {"message": "Problems parsing JSON"})
+                    return
+                if urlparse(self.path).path != "/graphql":
+                    self._reply(404, {"message": "Not Found"})
+                    return
+                allowed, headers = fake.graphql_quota.take()
+                if not allowed:
+                    self._limited(headers)
+                    return
+                self._reply(200, fake.graphql(body), headers)
+
+        return Handler
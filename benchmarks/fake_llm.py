@@ -0,0 +1,56 @@
+"""
+Stand-in for the Groq chat model.
+
+Implements the parts of the chat model interface the agent uses:
+invoke(prompt).content and with_structured_output(schema).invoke(prompt).
+Each completion sleeps first_token_latency + tokens * token_latency to
+mimic a hosted model's generation time.
+"""
+
+import time
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class FakeMessage:
+    content: str
+
+
+class FakeChatModel:
+    def __init__(self, first_token_latency: float = 0.05, token_latency: float = 0.0005,
+                 tokens: int = 150):
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.tokens = tokens
+        self.calls = 0
+        self.generated_tokens = 0
+        self._lock = threading.Lock()
+
+    def _generate(self, prompt) -> str:
+        time.sleep(self.first_token_latency + self.tokens * self.token_latency)
+        with self._lock:
+            self.calls += 1
+            self.generated_tokens += self.tokens
+        seed = abs(hash(str(prompt))) % 10000
+        return " ".join(f"word{(seed + i) % 97}" for i in range(self.tokens))
+
+    def invoke(self, prompt, **kwargs) -> FakeMessage:
+        return FakeMessage(self._generate(prompt))
+
+    def with_structured_output(self, schema, **kwargs):
+        return _StructuredModel(self, schema)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "tokens": self.generated_tokens}
+
+
+class _StructuredModel:
+    def __init__(self, model: FakeChatModel, schema: dict):
+        self.model = model
+        self.schema = schema
+
+    def invoke(self, prompt, **kwargs) -> dict:
+        text = self.model._generate(prompt)
+        return {key: f"{key}: {text}" for key in self.schema.get("required", [])}
@@ -0,0 +1,340 @@
+"""
+Offline benchmark suite.
+
+Runs the agent and the Flask API against the local fake GitHub server
+and fake chat model, in a throwaway data directory, at several repo
+counts and with a long metric history:
+
+    agent_invoke   full graph run (fetch, persist, summary, post) per repo
+    sync           POST /api/sync and wait for the job, latency per repo
+    dashboard      GET /api/dashboard
+    history        GET /api/history at raw/hour/day resolution
+
+Each scenario reports p50/p99 latency, throughput and the tracemalloc
+peak. Results can be saved as a baseline and later runs compared
+against it:
+
+    python benchmarks/run.py --save-baseline
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+The comparison exits 1 when p50, p99 or peak memory regresses by more
+than --tolerance.
+"""
+
+import os
+import io
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_github import FakeGitHub
+from fake_llm import FakeChatModel
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+# metrics compared against the baseline, lower is better for all of them
+COMPARED = ("p50_ms", "p99_ms", "peak_kb")
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(samples_ms, elapsed: float, peak: int, count: int = None) -> dict:
+    count = len(samples_ms) if count is None else count
+    return {
+        "count": count,
+        "p50_ms": round(percentile(samples_ms, 50), 2),
+        "p99_ms": round(percentile(samples_ms, 99), 2),
+        "throughput": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+@contextlib.contextmanager
+def measured(track_memory: bool):
+    """Yields a dict that gets elapsed seconds and peak traced bytes on exit"""
+    result = {}
+    if track_memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["elapsed"] = time.perf_counter() - t0
+        if track_memory:
+            result["peak"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            result["peak"] = 0
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """Swallow the agent's progress prints while timing"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def make_repos(count: int) -> list:
+    return [
+        {
+            "id": i,
+            "url": f"https://github.com/bench-org/repo-{i}",
+            "owner": "bench-org",
+            "name": f"repo-{i}",
+            "added_at": datetime.now().isoformat(),
+            "last_checked": None
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.data_dir = tempfile.mkdtemp(prefix="git-tracker-bench-")
+        self.github = FakeGitHub(
+            latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+            rate_limit=args.rate_limit, graphql_limit=args.rate_limit
+        ).start()
+        self.model = FakeChatModel(
+            first_token_latency=args.first_token_ms / 1000,
+            token_latency=args.token_latency_ms / 1000,
+            tokens=args.tokens
+        )
+        # everything below reads its config at import time
+        os.environ.update({
+            "GITHUB_API_URL": self.github.url,
+            "GITHUB_GRAPHQL_URL": f"{self.github.url}/graphql",
+            "GITHUB_TOKEN": "bench",
+            "GROQ_API_KEY": "bench",
+            "METRICS_DB": os.path.join(self.data_dir, "metrics.db"),
+            "GITHUB_CACHE_FILE": os.path.join(self.data_dir, "github_cache.db"),
+            "LLM_CACHE_FILE": os.path.join(self.data_dir, "llm_cache.db"),
+            # measure real generation, not memo hits
+            "LLM_CACHE_TTL": "0",
+            "COLLECTOR_ENABLED": "0"
+        })
+        for key in ("SMTP_HOST", "SMTP_PORT", "SMTP_USER", "SMTP_PASS"):
+            os.environ.pop(key, None)
+
+        import agent
+        import api
+        from registry import RepoRegistry
+        agent.get_model = lambda: self.model
+        api.REPOS_FILE = os.path.join(self.data_dir, "connected_repos.json")
+        api.registry = RepoRegistry(api.REPOS_FILE)
+        self.agent = agent
+        self.api = api
+        self.client = api.app.test_client()
+
+    def close(self):
+        self.github.stop()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def use_repos(self, count: int) -> list:
+        repos = make_repos(count)
+        self.api.registry.flush()
+        # written behind the registry's back, it reloads on the mtime change
+        with open(self.api.REPOS_FILE, "w") as f:
+            json.dump({"next_id": count + 1, "repos": repos}, f)
+        return repos
+
+    def bench_agent_invoke(self, repos) -> dict:
+        sample = repos[:self.args.invoke_sample]
+        samples = []
+        with measured(self.args.memory) as m, quiet(not self.args.verbose):
+            for repo in sample:
+                t0 = time.perf_counter()
+                self.agent.get_app().invoke({
+                    "repo_url": repo["url"],
+                    "social_type": "linkedin",
+                    "force_refresh": True,
+                    "defer_email": True,
+                    "previous_metrics": {"stars": 0, "views": 0, "uni_view": 0, "clone": 0, "uni_clone": 0}
+                })
+                samples.append((time.perf_counter() - t0) * 1000)
+        return summarize(samples, m["elapsed"], m["peak"])
+
+    def bench_sync(self, repos) -> dict:
+        with measured(self.args.memory) as m, quiet(not self.args.verbose):
+            resp = self.client.post("/api/sync")
+            job_id = resp.get_json()["job_id"]
+            while True:
+                job = self.client.get(f"/api/sync/{job_id}").get_json()
+                if job["state"] == "done":
+                    break
+                time.sleep(0.05)
+        samples = [entry["duration_ms"] for entry in job["repos"] if entry["duration_ms"] is not None]
+        result = summarize(samples, m["elapsed"], m["peak"], count=len(repos))
+        result["statuses"] = job["counts"]
+        return result
+
+    def bench_get(self, path_for) -> dict:
+        samples = []
+        with measured(self.args.memory) as m, quiet(not self.args.verbose):
+            for i in range(self.args.requests):
+                path = path_for(i)
+                t0 = time.perf_counter()
+                resp = self.client.get(path)
+                samples.append((time.perf_counter() - t0) * 1000)
+                if resp.status_code != 200:
+                    raise RuntimeError(f"GET {path} returned {resp.status_code}")
+        return summarize(samples, m["elapsed"], m["peak"])
+
+    def seed_history(self, repos):
+        """Hourly points going back history_points hours for the first history_repos repos"""
+        from storage import save_current_metrics
+        start = datetime.now() - timedelta(hours=self.args.history_points)
+        for repo in repos[:self.args.history_repos]:
+            stars = random.randint(0, 500)
+            for hour in range(self.args.history_points):
+                stars += random.randint(0, 3)
+                save_current_metrics(repo["url"], {
+                    "stars": stars,
+                    "view": random.randint(0, 300),
+                    "unique_views": random.randint(0, 100),
+                    "clones": random.randint(0, 50),
+                    "unique_clone": random.randint(0, 20),
+                    "timestamp": (start + timedelta(hours=hour)).isoformat()
+                })
+
+    def run(self) -> dict:
+        results = {}
+        for count in self.args.repos:
+            repos = self.use_repos(count)
+            print(f"== {count} repos ==")
+            for name, fn in (
+                ("agent_invoke", lambda: self.bench_agent_invoke(repos)),
+                ("sync", lambda: self.bench_sync(repos)),
+                ("dashboard", lambda: self.bench_get(lambda i: "/api/dashboard")),
+            ):
+                results[f"{name}@{count}"] = fn()
+                print(f"  {name:<14} {format_result(results[f'{name}@{count}'])}")
+
+        repos = self.use_repos(max(self.args.repos))
+        print(f"== history, {self.args.history_repos} repos x {self.args.history_points} points ==")
+        with quiet(not self.args.verbose):
+            self.seed_history(repos)
+        history_ids = [r["id"] for r in repos[:self.args.history_repos]]
+        for resolution in ("raw", "hour", "day"):
+            key = f"history_{resolution}@{self.args.history_points}"
+            results[key] = self.bench_get(
+                lambda i: f"/api/history/{history_ids[i % len(history_ids)]}?resolution={resolution}"
+            )
+            print(f"  {resolution:<14} {format_result(results[key])}")
+        return results
+
+
+def format_result(r: dict) -> str:
+    return (f"p50 {r['p50_ms']:>9.2f} ms  p99 {r['p99_ms']:>9.2f} ms  "
+            f"{r['throughput']:>8.2f}/s  peak {r['peak_kb']:>9.1f} KiB")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Human readable regressions of current vs baseline results"""
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        now = current["results"].get(key)
+        if not now:
+            continue
+        for metric in COMPARED:
+            if not base.get(metric):
+                continue
+            ratio = now[metric] / base[metric]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{key} {metric}: {base[metric]} -> {now[metric]} (+{(ratio - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline git-tracker benchmarks")
+    parser.add_argument("--repos", default="10,100,1000", help="comma separated repo counts")
+    parser.add_argument("--invoke-sample", type=int, default=50, help="agent runs per repo count")
+    parser.add_argument("--requests", type=int, default=50, help="GETs per read scenario")
+    parser.add_argument("--history-points", type=int, default=24 * 90)
+    parser.add_argument("--history-repos", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--rate-limit", type=int, default=50000)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-latency-ms", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=150)
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip tracemalloc, which slows everything it measures")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    args.repos = [int(n) for n in args.repos.split(",") if n]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    bench = Bench(args)
+    try:
+        results = bench.run()
+    finally:
+        github_stats = bench.github.stats()
+        bench.close()
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "memory_tracked": args.memory,
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "save_baseline", "compare")},
+            "fake_github": github_stats,
+            "fake_llm": bench.model.stats()
+        },
+        "results": results
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("memory_tracked") != args.memory:
+            print("Warning: baseline was recorded with different memory tracking, latencies aren't comparable")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance * 100:.0f}%:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Incremental commit timeline ingestion.
+
+The first run for a repo backfills up to COMMIT_BACKFILL_PAGES pages of
+history. Later runs ask only for commits since the newest one stored
+(minus COMMIT_SINCE_OVERLAP seconds, to catch commits pushed late with an
+older committer date) and stop paging once the last seen SHA turns up.
+Unchanged repos answer the conditional first page with a 304, which
+costs no GitHub quota.
+
+/api/commits then serves the timeline from storage.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from github_client import github_get, repo_path
+from storage import save_commits, load_commit_cursor, commit_date
+
+COMMITS_PER_PAGE = 100
+COMMIT_BACKFILL_PAGES = int(os.getenv("COMMIT_BACKFILL_PAGES", "3"))
+COMMIT_MAX_PAGES = int(os.getenv("COMMIT_MAX_PAGES", "10"))
+COMMIT_SINCE_OVERLAP = float(os.getenv("COMMIT_SINCE_OVERLAP", "86400"))
+
+
+def _since(last_date: str) -> str:
+    try:
+        moment = datetime.fromisoformat(last_date.replace("Z", "+00:00"))
+    except ValueError:
+        return last_date
+    return (moment - timedelta(seconds=COMMIT_SINCE_OVERLAP)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def ingest_commits(repo_url: str) -> int:
+    """Fetch and store commits newer than the stored cursor, returns how many were new"""
+    cursor = load_commit_cursor(repo_url)
+    params = {"per_page": COMMITS_PER_PAGE}
+    max_pages = COMMIT_BACKFILL_PAGES
+    if cursor and cursor["last_date"]:
+        params["since"] = _since(cursor["last_date"])
+        max_pages = COMMIT_MAX_PAGES
+
+    path = f"{repo_path(repo_url)}/commits"
+    newest = None
+    added = 0
+    for page in range(1, max_pages + 1):
+        resp = github_get(path, params={**params, "page": page})
+        if resp.status_code == 409:
+            # empty repository
+            break
+        resp.raise_for_status()
+        commits = resp.data if isinstance(resp.data, list) else []
+        if newest is None and commits:
+            newest = commits[0]
+        added += save_commits(repo_url, commits)
+        if len(commits) < COMMITS_PER_PAGE:
+            break
+        if cursor and any(c.get("sha") == cursor["last_sha"] for c in commits):
+            break
+
+    if newest is not None and (not cursor or commit_date(newest) >= cursor["last_date"]):
+        save_commits(repo_url, [], cursor={"last_sha": newest["sha"], "last_date": commit_date(newest)})
+    elif cursor is None:
+        # nothing to ingest yet, remember we looked so reads don't retry every time
+        save_commits(repo_url, [], cursor={"last_sha": "", "last_date": ""})
+    return added
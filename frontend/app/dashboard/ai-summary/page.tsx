@@ -1,7 +1,7 @@
 'use client';
 
 import Link from 'next/link';
-import { useState, useEffect, Suspense } from 'react';
+import { useState, useEffect, useRef, Suspense } from 'react';
 import { useSearchParams } from 'next/navigation';
 
 function AISummaryContent() {
@@ -13,6 +13,8 @@ function AISummaryContent() {
     const [isGenerating, setIsGenerating] = useState(false);
     const [analysis, setAnalysis] = useState<any>(null);
     const [isLoading, setIsLoading] = useState(true);
+    const [stage, setStage] = useState<string | null>(null);
+    const streamRef = useRef<EventSource | null>(null);
 
     useEffect(() => {
         if (repoId) {
@@ -37,23 +39,47 @@ function AISummaryContent() {
         }
     };
 
-    const handleGenerate = async (id: number) => {
+    const handleGenerate = (id: number) => {
+        // summary and post arrive token by token over server-sent events
+        streamRef.current?.close();
         setIsGenerating(true);
-        try {
-            const res = await fetch(`http://127.0.0.1:5000/api/summary/${id}`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ social_type: platform })
-            });
-            const data = await res.json();
-            setAnalysis(data);
-        } catch (err) {
-            console.error("Failed to generate summary", err);
-        } finally {
+        setAnalysis({ summary: '', post: '', social_type: platform });
+        setStage(null);
+
+        const source = new EventSource(`http://127.0.0.1:5000/api/summary/${id}/stream?social_type=${platform}`);
+        streamRef.current = source;
+
+        source.addEventListener('node', (e) => {
+            setStage(JSON.parse((e as MessageEvent).data).node);
+        });
+        source.addEventListener('token', (e) => {
+            const { node, text } = JSON.parse((e as MessageEvent).data);
+            const field = node === 'summary' ? 'summary' : 'post';
+            setAnalysis((prev: any) => ({ ...prev, [field]: (prev?.[field] || '') + text }));
+        });
+        source.addEventListener('summary', (e) => {
+            const { text } = JSON.parse((e as MessageEvent).data);
+            setAnalysis((prev: any) => ({ ...prev, summary: text }));
+        });
+        source.addEventListener('post', (e) => {
+            const { text } = JSON.parse((e as MessageEvent).data);
+            setAnalysis((prev: any) => ({ ...prev, post: text }));
+        });
+        const finish = () => {
+            source.close();
             setIsGenerating(false);
-        }
+            setStage(null);
+        };
+        source.addEventListener('done', finish);
+        source.addEventListener('error', (e) => {
+            const data = (e as MessageEvent).data;
+            if (data) console.error("Failed to generate summary", JSON.parse(data).message);
+            finish();
+        });
     };
 
+    useEffect(() => () => streamRef.current?.close(), []);
+
     useEffect(() => {
         if (repo && !isLoading) {
             handleGenerate(repo.id);
@@ -135,8 +161,10 @@ function AISummaryContent() {
                                 <span className="ml-4 text-[10px] text-zinc-500 font-mono">analysis_stream.log</span>
                             </div>
                             <div className="terminal-body min-h-[150px]">
-                                {isGenerating ? (
-                                    <div className="text-zinc-600 animate-pulse">Running inference on Llama-3.1-8B...</div>
+                                {isGenerating && !analysis?.summary ? (
+                                    <div className="text-zinc-600 animate-pulse">
+                                        {stage ? `Running node: ${stage}...` : 'Running inference on Llama-3.1-8B...'}
+                                    </div>
                                 ) : analysis ? (
                                     <div className="text-zinc-300 text-sm whitespace-pre-wrap leading-relaxed">
                                         {analysis.summary}
@@ -161,7 +189,7 @@ function AISummaryContent() {
                                     [COPY]
                                 </button>
                             </div>
-                            {isGenerating ? (
+                            {isGenerating && !analysis?.post ? (
                                 <div className="h-24 flex items-center justify-center font-mono text-zinc-800 tracking-tighter">RECOMPILING_SOCIAL_GRAPH...</div>
                             ) : analysis ? (
                                 <div className="text-zinc-400 font-mono text-sm leading-relaxed whitespace-pre-wrap italic">
@@ -53,7 +53,15 @@ export default function Dashboard() {
     const handleSyncAll = async () => {
         setIsSyncing(true);
         try {
-            await fetch('http://127.0.0.1:5000/api/sync', { method: 'POST' });
+            const res = await fetch('http://127.0.0.1:5000/api/sync', { method: 'POST' });
+            const { job_id } = await res.json();
+            // sync runs in the background, poll until every repo has finished
+            while (true) {
+                await new Promise((resolve) => setTimeout(resolve, 2000));
+                const progress = await fetch(`http://127.0.0.1:5000/api/sync/${job_id}`);
+                const job = await progress.json();
+                if (!progress.ok || job.state === 'done') break;
+            }
             await fetchDashboardData();
         } catch (err) {
             console.error("Sync failed", err);
@@ -56,8 +56,8 @@ export default function RepoDetailPage() {
                 if (foundRepo) {
                     setRepo(foundRepo);
 
-                    // Fetch History
-                    const resHistory = await fetch(`http://127.0.0.1:5000/api/history/${params.id}`);
+                    // Fetch History (daily rollups, last 90 days of buckets)
+                    const resHistory = await fetch(`http://127.0.0.1:5000/api/history/${params.id}?resolution=day&limit=90`);
                     const dataHistory = await resHistory.json();
 
                     // Transform history for charts (format dates)
@@ -0,0 +1,111 @@
+"""
+Persistent conditional-request cache for GitHub API responses.
+
+Responses are stored by url together with their ETag / Last-Modified
+validators. Later requests send If-None-Match / If-Modified-Since and a
+304 Not Modified (which GitHub does not count against the rate limit)
+is answered from the cached body. Entries are evicted least recently
+used first once the cache grows past GITHUB_CACHE_MAX_ENTRIES.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.getenv("GITHUB_CACHE_FILE", os.path.join(BASE_DIR, "github_cache.db"))
+CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "5000"))
+
+
+class ResponseCache:
+    def __init__(self, path: str = CACHE_FILE, max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def validators(self, url: str) -> dict:
+        """Conditional request headers for url, empty if nothing is cached"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get(self, url: str):
+        """Return the cached body for url after a 304, or None"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT body FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url: str, body, etag: str = None, last_modified: str = None):
+        """Record a full (non-304) fetch and store it if it carries validators"""
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                return
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(body), time.time())
+            )
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM responses WHERE url IN "
+                    "(SELECT url FROM responses ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+response_cache = ResponseCache()
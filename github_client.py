@@ -0,0 +1,232 @@
+"""
+Shared GitHub HTTP client.
+
+All GitHub calls (agent nodes and API routes) go through one pooled,
+keep-alive requests.Session so a sync over many repos reuses TCP/TLS
+connections instead of opening a new one per call.
+"""
+
+import os
+import re
+import time
+import threading
+from urllib.parse import urlparse
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from github_cache import response_cache
+from telemetry import GITHUB_REQUESTS, GITHUB_SECONDS
+from resilience import call_with_retries
+from rate_limit import (
+    rate_limiter,
+    graphql_rate_limiter,
+    is_rate_limited,
+    RateLimitExceeded,
+    RATE_LIMIT_RETRIES
+)
+
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+# Number of distinct hosts to keep pools for, and connections kept per host.
+# POOL_MAXSIZE should be at least the number of threads hitting GitHub at once.
+POOL_CONNECTIONS = int(os.getenv("GITHUB_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("GITHUB_POOL_MAXSIZE", "32"))
+# (connect, read) seconds, a hung connection must not hold a worker forever
+GITHUB_TIMEOUT = (
+    float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("GITHUB_READ_TIMEOUT", "20"))
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def default_headers():
+    """Headers sent with every GitHub request"""
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "git-tracker"
+    }
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+    return headers
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(default_headers())
+                _session = session
+    return _session
+
+
+def api_url(path: str) -> str:
+    """Build a full API url from a path like /repos/owner/name"""
+    if path.startswith("http://") or path.startswith("https://"):
+        return path
+    return f"{GITHUB_API_URL}/{path.lstrip('/')}"
+
+
+def repo_path(repo_url: str) -> str:
+    """Turn https://github.com/owner/repo into /repos/owner/repo"""
+    parts = [p for p in repo_url.rstrip("/").split("/") if p]
+    return f"/repos/{parts[-2]}/{parts[-1]}"
+
+
+class GitHubError(Exception):
+    """A GitHub API call came back with an error status"""
+
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        super().__init__(f"GitHub API returned {status_code}: {message}")
+
+
+@dataclass
+class GitHubResponse:
+    status_code: int
+    data: object
+    headers: dict = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def raise_for_status(self):
+        if not self.ok:
+            message = self.data.get("message", "") if isinstance(self.data, dict) else ""
+            raise GitHubError(self.status_code, message)
+
+
+# request headers that select a different representation of the same url
+CACHE_VARY_HEADERS = ("accept", "x-github-api-version")
+
+
+def _cache_key(url: str, params: dict = None, headers: dict = None) -> str:
+    """url + sorted params, plus any per-request header that changes the body.
+
+    Session defaults are the same for every request and stay out of the key.
+    """
+    key = url
+    if params:
+        key += "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+    vary = sorted(
+        (name.lower(), value) for name, value in (headers or {}).items()
+        if name.lower() in CACHE_VARY_HEADERS
+    )
+    if vary:
+        key += "#" + "&".join(f"{name}={value}" for name, value in vary)
+    return key
+
+
+_REPO_SEGMENT = re.compile(r"/repos/[^/]+/[^/]+")
+
+
+def endpoint_label(url: str) -> str:
+    """/repos/{owner}/{repo}/traffic/views style path, keeps metric labels bounded"""
+    if url == GITHUB_GRAPHQL_URL:
+        return "/graphql"
+    path = url[len(GITHUB_API_URL):] if url.startswith(GITHUB_API_URL) else url
+    return _REPO_SEGMENT.sub("/repos/{owner}/{repo}", path.split("?")[0]) or "/"
+
+
+def _json(resp):
+    try:
+        return resp.json()
+    except ValueError:
+        return None
+
+
+def _transient(exc) -> bool:
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _server_error(resp) -> bool:
+    return resp.status_code >= 500
+
+
+def _send(url: str, params: dict, headers: dict, method: str = "GET", body: dict = None,
+          limiter=rate_limiter):
+    """Send one request paced by the rate limiter, retrying rate-limit responses.
+
+    Connection errors, timeouts and 5xx are retried with backoff behind
+    the host's circuit breaker (see resilience.py).
+    """
+    endpoint = endpoint_label(url)
+    host = urlparse(url).netloc
+
+    def attempt():
+        with GITHUB_SECONDS.labels(endpoint=endpoint, method=method).time():
+            resp = get_session().request(method, url, params=params, headers=headers, json=body,
+                                         timeout=GITHUB_TIMEOUT)
+        GITHUB_REQUESTS.labels(endpoint=endpoint, method=method, status=resp.status_code).inc()
+        return resp
+
+    for attempt_no in range(RATE_LIMIT_RETRIES + 1):
+        limiter.acquire()
+        resp = call_with_retries(attempt, host, _transient, bad_result=_server_error)
+        limited = is_rate_limited(resp.status_code, resp.headers, _json(resp) if resp.status_code == 403 else None)
+        limiter.update(resp.headers, limited=limited)
+        if not limited:
+            return resp
+        wait = limiter.backoff(resp.headers)
+        print(f"GitHub rate limit hit on {url}, backing off {wait:.0f}s")
+        if wait > limiter.max_wait or attempt_no == RATE_LIMIT_RETRIES:
+            raise RateLimitExceeded(time.time() + wait)
+        time.sleep(wait)
+    return resp
+
+
+def github_get(path: str, params: dict = None, headers: dict = None,
+               use_cache: bool = True) -> GitHubResponse:
+    """GET a GitHub API path (or full url) through the shared session.
+
+    With use_cache the request is made conditional on the cached ETag and a
+    304 is answered from the response cache (reported as a 200 with
+    from_cache=True). Requests are paced by the shared rate limiter and
+    raise RateLimitExceeded when GitHub's quota can't be waited out.
+    """
+    url = api_url(path)
+    key = _cache_key(url, params, headers)
+    request_headers = dict(headers or {})
+    if use_cache:
+        request_headers.update(response_cache.validators(key))
+
+    resp = _send(url, params, request_headers)
+
+    if use_cache and resp.status_code == 304:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return GitHubResponse(200, cached, dict(resp.headers), from_cache=True)
+        # entry was evicted between the two lookups, fetch it unconditionally
+        resp = _send(url, params, headers)
+
+    data = _json(resp)
+    if use_cache and resp.status_code == 200:
+        response_cache.put(key, data, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return GitHubResponse(resp.status_code, data, dict(resp.headers))
+
+
+def github_graphql(query: str, variables: dict = None) -> GitHubResponse:
+    """POST a GraphQL query; GraphQL has its own quota so it has its own limiter"""
+    resp = _send(GITHUB_GRAPHQL_URL, None, None, method="POST",
+                 body={"query": query, "variables": variables or {}},
+                 limiter=graphql_rate_limiter)
+    return GitHubResponse(resp.status_code, _json(resp), dict(resp.headers))
@@ -0,0 +1,152 @@
+"""
+Email notifications.
+
+SMTPBatch keeps one (optionally STARTTLS + authenticated) SMTP connection
+open for a batch of messages, so a portfolio sync does one handshake
+instead of one per repo. send_digest rolls every synced repo into a
+single message; NOTIFY_MODE=per_repo sends one message per repo over
+the same connection instead.
+
+For local testing point SMTP_HOST/SMTP_PORT at a debugging server
+(e.g. `python -m aiosmtpd -n -l localhost:1025`) with SMTP_STARTTLS=0
+and no SMTP_USER/SMTP_PASS.
+"""
+
+import os
+import smtplib
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from dotenv import load_dotenv
+
+from telemetry import SMTP_SECONDS
+
+load_dotenv()
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT") or 0) or None
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASS = os.getenv("SMTP_PASS")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+NOTIFY_RECIPIENTS = [
+    r.strip() for r in os.getenv("NOTIFY_RECIPIENTS", "digiance.sagarit@gmail.com").split(",") if r.strip()
+]
+# "digest": one consolidated email per sync, "per_repo": one email per repo
+NOTIFY_MODE = os.getenv("NOTIFY_MODE", "digest")
+
+
+def smtp_configured() -> bool:
+    return bool(SMTP_HOST and SMTP_PORT)
+
+
+def build_message(subject: str, body: str, recipients=None):
+    msg = MIMEMultipart()
+    msg["From"] = SMTP_USER or f"git-tracker@{SMTP_HOST}"
+    msg["To"] = ", ".join(recipients or NOTIFY_RECIPIENTS)
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+    return msg
+
+
+class SMTPBatch:
+    """One SMTP session shared by every message sent inside the with block"""
+
+    def __init__(self):
+        self.server = None
+        self.sent = 0
+
+    def _connect(self):
+        with SMTP_SECONDS.labels(op="connect").time():
+            server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+            if SMTP_STARTTLS:
+                server.starttls()
+            if SMTP_USER and SMTP_PASS:
+                server.login(SMTP_USER, SMTP_PASS)
+        self.server = server
+
+    def __enter__(self):
+        self._connect()
+        return self
+
+    def send(self, msg):
+        with SMTP_SECONDS.labels(op="send").time():
+            try:
+                self.server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # server dropped an idle session, reconnect once
+                self._connect()
+                self.server.send_message(msg)
+        self.sent += 1
+
+    def __exit__(self, *exc):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except smtplib.SMTPException:
+                self.server.close()
+            self.server = None
+        return False
+
+
+def send_email(subject: str, body: str, recipients=None) -> str:
+    """Send a single message, returns a status string for the agent state"""
+    if not smtp_configured():
+        print("SMTP not configured, skipping email.")
+        return "skipped_no_config"
+    try:
+        with SMTPBatch() as batch:
+            batch.send(build_message(subject, body, recipients))
+        return "sent"
+    except Exception as e:
+        print(f"Failed to send email: {e}")
+        return f"error: {str(e)}"
+
+
+def format_alerts(alerts) -> str:
+    return "\n".join(f"! {alert}" for alert in alerts)
+
+
+def format_digest(entries) -> str:
+    sections = []
+    # repos with flagged anomalies lead the digest
+    for entry in sorted(entries, key=lambda e: not e.get('anomalies')):
+        body = entry.get('summary') or 'No summary available'
+        if entry.get('anomalies'):
+            body = format_alerts(entry['anomalies']) + "\n\n" + body
+        sections.append(f"=== {entry['repo']} ===\n{body}")
+    return f"GitHub summary for {len(entries)} repositories\n\n" + "\n\n".join(sections)
+
+
+def send_alert(repo: str, alerts, recipients=None) -> str:
+    """Email the anomalies flagged for one repo outside a sync"""
+    return send_email(
+        f"GitHub alert: {repo}",
+        f"Unusual activity on {repo}:\n\n{format_alerts(alerts)}",
+        recipients
+    )
+
+
+def send_digest(entries, recipients=None) -> str:
+    """Notify about a whole sync over one SMTP connection.
+
+    entries is a list of {"repo": name, "summary": text}, plus
+    "anomalies" (one line each) for repos that deviated.
+    """
+    if not entries:
+        return "skipped_empty"
+    if not smtp_configured():
+        print("SMTP not configured, skipping digest.")
+        return "skipped_no_config"
+    try:
+        with SMTPBatch() as batch:
+            if NOTIFY_MODE == "per_repo":
+                for entry in entries:
+                    body = entry.get('summary') or "No summary available"
+                    if entry.get('anomalies'):
+                        body = format_alerts(entry['anomalies']) + "\n\n" + body
+                    batch.send(build_message(f"Daily Github Summary: {entry['repo']}", body, recipients))
+            else:
+                batch.send(build_message("Daily Github Summary", format_digest(entries), recipients))
+        return "sent"
+    except Exception as e:
+        print(f"Failed to send digest: {e}")
+        return f"error: {str(e)}"
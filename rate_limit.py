@@ -0,0 +1,183 @@
+"""
+Rate-limit-aware scheduling for GitHub requests.
+
+The shared RateLimiter is a token bucket whose level mirrors GitHub's
+X-RateLimit-Remaining header and refills at X-RateLimit-Reset. While the
+quota is comfortable requests go straight through; once it runs low the
+remaining tokens are spread evenly over the time left until the reset so
+a multi-repo sync paces itself instead of hitting the wall. 403/429
+rate-limit responses (primary and secondary limits) block every caller
+until Retry-After / the reset time.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+
+# calls always left unused so a sync never drains the quota completely
+RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "50"))
+# below this many usable calls, start spacing requests out until the reset
+RATE_LIMIT_LOW_WATER = int(os.getenv("GITHUB_RATE_LIMIT_LOW_WATER", "500"))
+# longest a single request will wait for quota before giving up
+RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "60"))
+RATE_LIMIT_RETRIES = int(os.getenv("GITHUB_RATE_LIMIT_RETRIES", "3"))
+# GitHub recommends waiting at least a minute on a secondary limit without Retry-After
+SECONDARY_BACKOFF = 60.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than the allowed maximum"""
+
+    def __init__(self, retry_at: float):
+        self.retry_at = retry_at
+        when = datetime.fromtimestamp(retry_at).isoformat(timespec="seconds")
+        super().__init__(f"GitHub rate limit exhausted, retry after {when}")
+
+
+def _int_header(headers: dict, name: str):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(status_code: int, headers: dict, data=None) -> bool:
+    """True for primary or secondary rate-limit responses"""
+    if status_code == 429:
+        return True
+    if status_code != 403:
+        return False
+    if _int_header(headers, "X-RateLimit-Remaining") == 0 or "Retry-After" in headers:
+        return True
+    message = data.get("message", "") if isinstance(data, dict) else ""
+    return "rate limit" in message.lower()
+
+
+class RateLimiter:
+    def __init__(self, reserve: int = RATE_LIMIT_RESERVE, low_water: int = RATE_LIMIT_LOW_WATER,
+                 max_wait: float = RATE_LIMIT_MAX_WAIT):
+        self.reserve = reserve
+        self.low_water = low_water
+        self.max_wait = max_wait
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self._next_slot = 0.0
+        self._secondary_hits = 0
+        self._lock = threading.Lock()
+
+    def _delay(self, now: float) -> float:
+        """Seconds the next request has to wait; takes a token when it is 0"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.remaining is None:
+            return 0.0
+        if self.reset_at is not None and now >= self.reset_at:
+            # window rolled over, the next response will tell us the real numbers
+            self.remaining = self.limit
+            self.reset_at = None
+            return 0.0
+
+        usable = self.remaining - self.reserve
+        if usable <= 0:
+            return (self.reset_at or now) - now
+        if usable < self.low_water and self.reset_at is not None:
+            spacing = (self.reset_at - now) / usable
+            slot = max(self._next_slot, now)
+            if slot > now:
+                return slot - now
+            self._next_slot = now + spacing
+
+        self.remaining -= 1
+        return 0.0
+
+    def acquire(self):
+        """Block until a request may be sent, or raise RateLimitExceeded"""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._delay(now)
+            if wait <= 0:
+                return
+            if wait > self.max_wait:
+                raise RateLimitExceeded(now + wait)
+            time.sleep(wait)
+
+    def update(self, headers: dict, limited: bool = False):
+        """Sync the bucket with the X-RateLimit-* headers of a response"""
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        with self._lock:
+            if not limited:
+                self._secondary_hits = 0
+            if remaining is None:
+                return
+            self.remaining = remaining
+            self.limit = _int_header(headers, "X-RateLimit-Limit") or self.limit
+            reset = _int_header(headers, "X-RateLimit-Reset")
+            if reset is not None:
+                self.reset_at = float(reset)
+
+    def backoff(self, headers: dict) -> float:
+        """Block all callers after a 403/429 rate-limit response, returns the wait"""
+        now = time.time()
+        retry_after = _int_header(headers, "Retry-After")
+        with self._lock:
+            if retry_after is not None:
+                until = now + retry_after
+            elif _int_header(headers, "X-RateLimit-Remaining") == 0 and self.reset_at:
+                until = self.reset_at
+            else:
+                # secondary limit without a hint: exponential backoff from one minute
+                until = now + SECONDARY_BACKOFF * (2 ** min(self._secondary_hits, 4))
+                self._secondary_hits += 1
+            self.blocked_until = max(self.blocked_until, until)
+            return self.blocked_until - now
+
+    def deferred_until(self):
+        """Timestamp new work has to wait for if that is past max_wait, else None"""
+        with self._lock:
+            now = time.time()
+            if self.blocked_until - now > self.max_wait:
+                return self.blocked_until
+            if (self.remaining is not None and self.reset_at is not None
+                    and self.remaining - self.reserve <= 0 and self.reset_at - now > self.max_wait):
+                return self.reset_at
+            return None
+
+    def estimate_finish(self, pending_requests: int) -> datetime:
+        """Best guess of when pending_requests more calls will have been made"""
+        with self._lock:
+            now = time.time()
+            start = max(now, self.blocked_until)
+            if pending_requests <= 0 or self.remaining is None or self.reset_at is None:
+                return datetime.fromtimestamp(start)
+            usable = max(self.remaining - self.reserve, 0)
+            if pending_requests <= usable:
+                if usable < self.low_water:
+                    window = max(self.reset_at - start, 0)
+                    return datetime.fromtimestamp(start + window * pending_requests / usable)
+                return datetime.fromtimestamp(start)
+            # the rest has to wait for one or more full windows
+            per_window = max((self.limit or usable) - self.reserve, 1)
+            windows = -(-(pending_requests - usable) // per_window)
+            return datetime.fromtimestamp(max(self.reset_at, start) + (windows - 1) * 3600)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset_at": datetime.fromtimestamp(self.reset_at).isoformat() if self.reset_at else None,
+                "blocked_until": datetime.fromtimestamp(self.blocked_until).isoformat()
+                if self.blocked_until > time.time() else None
+            }
+
+
+rate_limiter = RateLimiter()
+# GraphQL is metered in points against a separate hourly quota
+graphql_rate_limiter = RateLimiter()
@@ -0,0 +1,126 @@
+"""
+Batched repository metadata collection.
+
+Stars, forks, watchers and open issues for many repos come from one
+aliased GraphQL query per GRAPHQL_BATCH_SIZE repos instead of one REST
+call each. Repos the batch can't serve (not found, no access, or the
+whole query failing) fall back to the REST repo endpoint. When GraphQL
+is rate limited (403/429, or a 200 whose errors say RATE_LIMITED) the
+remaining repos are left for the next sync instead; falling back would
+spend the REST quota too.
+
+Point GITHUB_API_URL / GITHUB_GRAPHQL_URL at a local stub server to
+exercise this without touching GitHub.
+"""
+
+import os
+import time
+
+from github_client import github_get, github_graphql, repo_path
+from rate_limit import graphql_rate_limiter, RateLimitExceeded
+
+GRAPHQL_BATCH_SIZE = int(os.getenv("GRAPHQL_BATCH_SIZE", "50"))
+
+REPO_FIELDS = """
+    stargazerCount
+    forkCount
+    watchers { totalCount }
+    issues(states: OPEN) { totalCount }
+"""
+
+
+def _owner_name(repo_url: str):
+    _, _, owner, name = repo_path(repo_url).split("/")
+    return owner, name
+
+
+def build_query(repo_urls):
+    """Aliased query r0..rN with owner/name passed as variables"""
+    params = []
+    fields = []
+    variables = {}
+    for i, url in enumerate(repo_urls):
+        owner, name = _owner_name(url)
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{REPO_FIELDS}}}")
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+    return query, variables
+
+
+def _from_graphql(node: dict) -> dict:
+    return {
+        "stars": node["stargazerCount"],
+        "forks": node["forkCount"],
+        "watchers": node["watchers"]["totalCount"],
+        "open_issues": node["issues"]["totalCount"]
+    }
+
+
+def _from_rest(repo_url: str):
+    resp = github_get(repo_path(repo_url))
+    if not resp.ok or not isinstance(resp.data, dict):
+        return None
+    data = resp.data
+    return {
+        "stars": data.get("stargazers_count", 0),
+        "forks": data.get("forks_count", 0),
+        "watchers": data.get("subscribers_count", 0),
+        # REST counts open pull requests as issues too
+        "open_issues": data.get("open_issues_count", 0)
+    }
+
+
+def _rate_limited(payload: dict) -> bool:
+    return any(isinstance(e, dict) and e.get("type") == "RATE_LIMITED" for e in payload.get("errors") or [])
+
+
+def fetch_batch(repo_urls) -> dict:
+    """Metadata for one batch via GraphQL, {url: metadata}; missing urls were not served.
+
+    Raises RateLimitExceeded when GraphQL is rate limited.
+    """
+    query, variables = build_query(repo_urls)
+    try:
+        resp = github_graphql(query, variables)
+    except RateLimitExceeded:
+        raise
+    except Exception as e:
+        print(f"GraphQL batch failed: {e}")
+        return {}
+    payload = resp.data if isinstance(resp.data, dict) else {}
+    if _rate_limited(payload):
+        # GraphQL reports its limit as a 200, back off like the 403/429 path does
+        raise RateLimitExceeded(time.time() + graphql_rate_limiter.backoff(resp.headers))
+    data = payload.get("data") or {}
+    results = {}
+    for i, url in enumerate(repo_urls):
+        node = data.get(f"r{i}")
+        if node:
+            results[url] = _from_graphql(node)
+    return results
+
+
+def fetch_repo_metadata(repo_urls, batch_size: int = GRAPHQL_BATCH_SIZE) -> dict:
+    """Metadata for every url, GraphQL in batches with REST fallback"""
+    repo_urls = list(repo_urls)
+    results = {}
+    for start in range(0, len(repo_urls), batch_size):
+        batch = repo_urls[start:start + batch_size]
+        try:
+            results.update(fetch_batch(batch))
+        except RateLimitExceeded as e:
+            print(f"GraphQL metadata deferred for {len(repo_urls) - start} repos: {e}")
+            break
+        for url in batch:
+            if url in results:
+                continue
+            try:
+                metadata = _from_rest(url)
+            except Exception as e:
+                print(f"REST fallback failed for {url}: {e}")
+                metadata = None
+            if metadata:
+                results[url] = metadata
+    return results
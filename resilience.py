@@ -0,0 +1,173 @@
+"""
+Retries and circuit breakers for upstream calls (GitHub, Groq).
+
+call_with_retries runs one call through the host's circuit breaker and
+retries transient failures (connection errors, timeouts, 5xx) with
+capped exponential backoff and full jitter. After BREAKER_FAILURES
+consecutive failures a host's breaker opens and calls fail fast with
+CircuitOpenError for BREAKER_RESET seconds; then a single trial call is
+let through and its outcome closes or re-opens the breaker.
+
+Per-call timeouts are set where the clients are built (github_client,
+agent.get_model), this module bounds how often and how long we retry.
+"""
+
+import os
+import time
+import random
+import threading
+
+from telemetry import UPSTREAM_ATTEMPTS, CIRCUIT_STATE
+
+RETRY_ATTEMPTS = int(os.getenv("UPSTREAM_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "30"))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """The host's breaker is open, the call was not attempted"""
+
+    def __init__(self, host: str, retry_at: float):
+        self.host = host
+        self.retry_at = retry_at
+        super().__init__(f"{host} is failing, circuit open for another {max(retry_at - time.time(), 0):.0f}s")
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failures: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET):
+        self.host = host
+        self.max_failures = failures
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._gauge = CIRCUIT_STATE.labels(host=host)
+        self._gauge.set(0)
+
+    def _set(self, state: str):
+        self.state = state
+        self._gauge.set(_STATE_VALUES[state])
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go out now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.time()
+            if self.state == OPEN and now - self.opened_at >= self.reset_after:
+                self._set(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_running:
+                # exactly one caller probes the host
+                self._trial_running = True
+                return
+            raise CircuitOpenError(self.host, self.opened_at + self.reset_after)
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            if self.state != CLOSED:
+                print(f"Circuit for {self.host} closed")
+                self._set(CLOSED)
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.max_failures):
+                if self.state == CLOSED:
+                    print(f"Circuit for {self.host} opened after {self.failures} failures")
+                self.opened_at = time.time()
+                self.opened += 1
+                self._set(OPEN)
+
+    def release(self):
+        """The call failed before telling us anything about the host"""
+        with self._lock:
+            self._trial_running = False
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.opened
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(host: str) -> CircuitBreaker:
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(host, CircuitBreaker(host))
+    return breaker
+
+
+def breaker_status() -> dict:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.host: b.status() for b in breakers}
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_retries(fn, host: str, is_transient, bad_result=None, retries: int = RETRY_ATTEMPTS):
+    """Run fn() through host's breaker, retrying transient failures.
+
+    is_transient(exc) says whether an exception is worth retrying;
+    bad_result(result), if given, marks a returned value as a transient
+    failure (e.g. a 5xx response), which is returned as is once retries
+    run out. Other exceptions propagate right away and leave the breaker
+    as it was.
+    """
+    breaker = breaker_for(host)
+    for attempt in range(retries + 1):
+        try:
+            breaker.allow()
+        except CircuitOpenError:
+            UPSTREAM_ATTEMPTS.labels(host=host, outcome="circuit_open").inc()
+            raise
+        last = attempt == retries
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_transient(e):
+                # not the host's fault (bad request, our own bug), no retry
+                breaker.release()
+                UPSTREAM_ATTEMPTS.labels(host=host, outcome="error").inc()
+                raise
+            breaker.failure()
+            UPSTREAM_ATTEMPTS.labels(host=host, outcome="transient").inc()
+            if last:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"{host}: {e}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if bad_result is not None and bad_result(result):
+            breaker.failure()
+            UPSTREAM_ATTEMPTS.labels(host=host, outcome="transient").inc()
+            if last:
+                return result
+            delay = backoff_delay(attempt)
+            print(f"{host}: upstream error response, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        breaker.success()
+        UPSTREAM_ATTEMPTS.labels(host=host, outcome="ok").inc()
+        return result
@@ -0,0 +1,115 @@
+"""
+Stargazer history backfill.
+
+The stargazers endpoint with the star+json media type lists every
+current stargazer with its starred_at time, oldest first. Pages are
+fetched STAR_BACKFILL_CONCURRENCY at a time and stored as soon as they
+arrive (storage.save_star_page), so memory stays at a few pages and an
+interrupted run resumes where it stopped.
+
+Stargazers are stored by login, never counted per page: an unstar
+shifts every later page by one, so page boundaries move between runs.
+A user seen twice is stored once, and the page before every pending
+stretch is fetched again so users that shifted back across the
+boundary aren't skipped. The last page keeps growing and is refetched
+on every run.
+
+A run never takes the GitHub quota below STAR_BACKFILL_HEADROOM requests
+(left for syncs and the collector); pages it can't afford stay pending
+for the next run. GitHub lists at most 400 pages (40k stargazers) and
+users who unstarred before the first run are gone from the list, so the
+curve is close to the history of today's stargazers.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from github_client import github_get, repo_path
+from rate_limit import rate_limiter, RateLimitExceeded
+from storage import save_star_page, load_star_pages, save_star_backfill, load_star_backfill
+
+STAR_MEDIA_TYPE = "application/vnd.github.star+json"
+STARS_PER_PAGE = 100
+STAR_MAX_PAGES = 400
+STAR_BACKFILL_CONCURRENCY = int(os.getenv("STAR_BACKFILL_CONCURRENCY", "4"))
+STAR_BACKFILL_HEADROOM = int(os.getenv("STAR_BACKFILL_HEADROOM", "500"))
+
+_LAST_PAGE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+def _fetch_page(repo_url: str, page: int):
+    # use_cache=False: hundreds of one-off pages would only churn the ETag cache
+    resp = github_get(
+        f"{repo_path(repo_url)}/stargazers",
+        params={"per_page": STARS_PER_PAGE, "page": page},
+        headers={"Accept": STAR_MEDIA_TYPE},
+        use_cache=False
+    )
+    resp.raise_for_status()
+    return resp
+
+
+def _save(repo_url: str, page: int, stargazers):
+    users = [
+        (s["user"]["login"], s["starred_at"])
+        for s in stargazers if s.get("starred_at") and (s.get("user") or {}).get("login")
+    ]
+    save_star_page(repo_url, page, users, len(stargazers))
+
+
+def _pages_to_fetch(total_pages: int, done: dict) -> list:
+    """Pages not checkpointed as full, each stretch preceded by one overlap page"""
+    pending = [p for p in range(2, total_pages + 1) if done.get(p) != STARS_PER_PAGE]
+    overlap = {p - 1 for p in pending if p - 1 >= 2 and p - 1 not in pending}
+    return sorted(set(pending) | overlap)
+
+
+def _total_pages(resp) -> int:
+    match = _LAST_PAGE.search(resp.headers.get("Link", ""))
+    if match:
+        return min(int(match.group(1)), STAR_MAX_PAGES)
+    return 1 if resp.data else 0
+
+
+def _budget(headroom: int) -> int:
+    """Pages this run may fetch without eating into the headroom"""
+    remaining = rate_limiter.status()["remaining"]
+    if remaining is None:
+        return STAR_MAX_PAGES
+    return max(remaining - rate_limiter.reserve - headroom, 0)
+
+
+def backfill_stars(repo_url: str, concurrency: int = STAR_BACKFILL_CONCURRENCY,
+                   headroom: int = STAR_BACKFILL_HEADROOM) -> dict:
+    """Fetch the stargazer pages not checkpointed yet, returns the backfill progress"""
+    first = _fetch_page(repo_url, 1)
+    total_pages = _total_pages(first)
+    save_star_backfill(repo_url, total_pages, "running")
+    if total_pages:
+        _save(repo_url, 1, first.data)
+
+    done = load_star_pages(repo_url)
+    pending = _pages_to_fetch(total_pages, done)
+    todo = pending[:_budget(headroom)]
+    if len(todo) < len(pending):
+        print(f"Star backfill for {repo_url}: {len(pending) - len(todo)} pages left for a later run (quota)")
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="stars") as pool:
+        futures = {pool.submit(lambda p: _save(repo_url, p, _fetch_page(repo_url, p).data), p): p for p in todo}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                future.result()
+            except RateLimitExceeded:
+                # the rest waits for the next run, checkpoints keep what we have
+                for other in futures:
+                    other.cancel()
+            except Exception as e:
+                print(f"Star backfill page {futures[future]} failed for {repo_url}: {e}")
+
+    done = load_star_pages(repo_url)
+    complete = all(p in done for p in range(1, total_pages + 1))
+    save_star_backfill(repo_url, total_pages, "complete" if complete else "partial")
+    return load_star_backfill(repo_url)
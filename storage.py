@@ -0,0 +1,719 @@
+"""
+Metric history storage.
+
+Snapshots live in an SQLite database in WAL mode, indexed by
+(repo_url, timestamp), so saving a point is a single append and the
+latest point for a repo is an index lookup instead of a parse of the
+whole history. Concurrent sync workers each get their own connection.
+
+The old metrics_history.json (both the list-per-repo format and the
+older single-dict format) is imported once, the first time the database
+is opened.
+"""
+
+import os
+import json
+import sqlite3
+import time
+import threading
+from datetime import datetime, timedelta
+
+from telemetry import timed_storage
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_DB = os.getenv("METRICS_DB", os.path.join(BASE_DIR, "metrics.db"))
+METRICS_FILE = os.path.join(BASE_DIR, "metrics_history.json")
+
+METRIC_COLUMNS = ("stars", "view", "unique_views", "clones", "unique_clone")
+# keys written by the very first persist_metrics, mapped to the current names
+LEGACY_KEYS = {"views": "view", "uni_view": "unique_views", "clone": "clones", "uni_clone": "unique_clone"}
+
+# rollup buckets maintained on every write: key -> length of the ISO prefix
+ROLLUP_RESOLUTIONS = {"hour": 13, "day": 10}
+ROLLUP_AGGREGATES = ("min", "max", "last")
+GROWTH_WINDOWS = {"1d": 1, "7d": 7, "30d": 30}
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _init_db(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY,
+            repo_url TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            stars INTEGER NOT NULL DEFAULT 0,
+            view INTEGER NOT NULL DEFAULT 0,
+            unique_views INTEGER NOT NULL DEFAULT 0,
+            clones INTEGER NOT NULL DEFAULT 0,
+            unique_clone INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_metrics_repo_time ON metrics(repo_url, timestamp);
+        CREATE TABLE IF NOT EXISTS metric_fetches (
+            repo_url TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (repo_url, metric)
+        );
+        CREATE TABLE IF NOT EXISTS traffic_daily (
+            repo_url TEXT NOT NULL,
+            day TEXT NOT NULL,
+            views INTEGER,
+            unique_views INTEGER,
+            clones INTEGER,
+            unique_clones INTEGER,
+            PRIMARY KEY (repo_url, day)
+        );
+        CREATE TABLE IF NOT EXISTS metrics_rollup (
+            repo_url TEXT NOT NULL,
+            resolution TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            samples INTEGER NOT NULL,
+            last_ts TEXT NOT NULL,
+            %s,
+            PRIMARY KEY (repo_url, resolution, bucket)
+        );
+        CREATE TABLE IF NOT EXISTS repo_summary (
+            repo_url TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            stars INTEGER NOT NULL,
+            view INTEGER NOT NULL,
+            clones INTEGER NOT NULL,
+            growth TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS commits (
+            repo_url TEXT NOT NULL,
+            sha TEXT NOT NULL,
+            committed_at TEXT NOT NULL,
+            author_login TEXT,
+            author_name TEXT,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (repo_url, sha)
+        );
+        CREATE INDEX IF NOT EXISTS idx_commits_repo_time ON commits(repo_url, committed_at, sha);
+        CREATE TABLE IF NOT EXISTS stargazers (
+            repo_url TEXT NOT NULL,
+            login TEXT NOT NULL,
+            starred_at TEXT NOT NULL,
+            PRIMARY KEY (repo_url, login)
+        );
+        CREATE INDEX IF NOT EXISTS idx_stargazers_repo_time ON stargazers(repo_url, starred_at);
+        CREATE TABLE IF NOT EXISTS star_backfill (
+            repo_url TEXT PRIMARY KEY,
+            total_pages INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS star_pages (
+            repo_url TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            PRIMARY KEY (repo_url, page)
+        );
+        CREATE TABLE IF NOT EXISTS metric_stats (
+            repo_url TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            mean REAL NOT NULL,
+            var REAL NOT NULL,
+            last_value INTEGER,
+            last_at TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (repo_url, metric)
+        );
+        CREATE TABLE IF NOT EXISTS commit_cursor (
+            repo_url TEXT PRIMARY KEY,
+            last_sha TEXT NOT NULL,
+            last_date TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        );
+    """ % ",\n            ".join(f"{col}_{agg} INTEGER" for col in METRIC_COLUMNS for agg in ROLLUP_AGGREGATES))
+    conn.commit()
+    migrated = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+    if not migrated:
+        _migrate_json(conn)
+    built = conn.execute("SELECT value FROM meta WHERE key = 'rollups_built'").fetchone()
+    if not built:
+        _build_rollups(conn)
+    summarized = conn.execute("SELECT value FROM meta WHERE key = 'summaries_built'").fetchone()
+    if not summarized:
+        _build_summaries(conn)
+
+
+def _migrate_json(conn):
+    """One-shot import of metrics_history.json"""
+    imported = 0
+    if os.path.exists(METRICS_FILE):
+        try:
+            with open(METRICS_FILE, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            data = {}
+        # points from before timestamps were recorded get the file's mtime
+        fallback_ts = datetime.fromtimestamp(os.path.getmtime(METRICS_FILE)).isoformat()
+        for repo_url, points in data.items():
+            if isinstance(points, dict):
+                points = [points]
+            for point in points or []:
+                _insert(conn, repo_url, _normalize(point, fallback_ts))
+                imported += 1
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+        (datetime.now().isoformat(),)
+    )
+    conn.commit()
+    if imported:
+        print(f"Imported {imported} metric points from {METRICS_FILE}")
+
+
+def _build_rollups(conn):
+    """One-shot rollup build for history stored before rollups existed"""
+    conn.execute("DELETE FROM metrics_rollup")
+    rows = conn.execute("SELECT * FROM metrics ORDER BY timestamp, id")
+    for row in rows.fetchall():
+        _rollup(conn, row["repo_url"], {col: row[col] for col in METRIC_COLUMNS}, row["timestamp"])
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('rollups_built', ?)",
+        (datetime.now().isoformat(),)
+    )
+    conn.commit()
+
+
+def _build_summaries(conn):
+    """One-shot build of repo_summary from existing history"""
+    conn.execute("DELETE FROM repo_summary")
+    latest = conn.execute(
+        "SELECT * FROM metrics m WHERE id = (SELECT id FROM metrics WHERE repo_url = m.repo_url "
+        "ORDER BY timestamp DESC, id DESC LIMIT 1)"
+    ).fetchall()
+    for row in latest:
+        _refresh_summary(conn, row["repo_url"], {col: row[col] for col in METRIC_COLUMNS}, row["timestamp"])
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('summaries_built', ?)",
+        (datetime.now().isoformat(),)
+    )
+    conn.commit()
+
+
+def _growth(conn, repo_url: str, metrics: dict, timestamp: str) -> dict:
+    """Deltas and percentages against the daily rollup 1, 7 and 30 days back"""
+    growth = {}
+    now = datetime.fromisoformat(timestamp)
+    for label, days in GROWTH_WINDOWS.items():
+        bucket = _bucket((now - timedelta(days=days)).isoformat(), "day")
+        base = conn.execute(
+            "SELECT stars_last, view_last, clones_last FROM metrics_rollup "
+            "WHERE repo_url = ? AND resolution = 'day' AND bucket <= ? ORDER BY bucket DESC LIMIT 1",
+            (repo_url, bucket)
+        ).fetchone()
+        for col, key in (("stars", "stars"), ("view", "views"), ("clones", "clones")):
+            entry = growth.setdefault(key, {})
+            if base is None:
+                entry[label] = None
+                continue
+            previous = base[f"{col}_last"] or 0
+            delta = int(metrics.get(col) or 0) - previous
+            entry[label] = {
+                "delta": delta,
+                "pct": round(delta * 100 / previous, 1) if previous else None
+            }
+    return growth
+
+
+def _refresh_summary(conn, repo_url: str, metrics: dict, timestamp: str):
+    """Update a repo's materialized latest values and growth"""
+    old = conn.execute(
+        "SELECT timestamp FROM repo_summary WHERE repo_url = ?", (repo_url,)
+    ).fetchone()
+    if old and old["timestamp"] > timestamp:
+        return
+    new = {col: int(metrics.get(col) or 0) for col in ("stars", "view", "clones")}
+    conn.execute(
+        "INSERT OR REPLACE INTO repo_summary (repo_url, timestamp, stars, view, clones, growth) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (repo_url, timestamp, new["stars"], new["view"], new["clones"],
+         json.dumps(_growth(conn, repo_url, metrics, timestamp)))
+    )
+
+
+def _bucket(timestamp: str, resolution: str) -> str:
+    prefix = timestamp[:ROLLUP_RESOLUTIONS[resolution]]
+    return prefix + ("T00:00:00" if resolution == "day" else ":00:00")
+
+
+def _rollup(conn, repo_url: str, metrics: dict, timestamp: str):
+    """Fold one point into its hourly and daily buckets (min/max/last per metric)"""
+    values = [int(metrics.get(col) or 0) for col in METRIC_COLUMNS]
+    columns = [f"{col}_{agg}" for col in METRIC_COLUMNS for agg in ROLLUP_AGGREGATES]
+    updates = []
+    for col in METRIC_COLUMNS:
+        updates.append(f"{col}_min = MIN({col}_min, excluded.{col}_min)")
+        updates.append(f"{col}_max = MAX({col}_max, excluded.{col}_max)")
+        updates.append(
+            f"{col}_last = CASE WHEN excluded.last_ts >= last_ts THEN excluded.{col}_last ELSE {col}_last END"
+        )
+    sql = (
+        f"INSERT INTO metrics_rollup (repo_url, resolution, bucket, samples, last_ts, {', '.join(columns)}) "
+        f"VALUES (?, ?, ?, 1, ?, {', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT(repo_url, resolution, bucket) DO UPDATE SET samples = samples + 1, "
+        f"{', '.join(updates)}, last_ts = MAX(last_ts, excluded.last_ts)"
+    )
+    for resolution in ROLLUP_RESOLUTIONS:
+        conn.execute(sql, (repo_url, resolution, _bucket(timestamp, resolution), timestamp,
+                           *(v for v in values for _ in ROLLUP_AGGREGATES)))
+
+
+def _normalize(point: dict, fallback_ts: str) -> dict:
+    row = {LEGACY_KEYS.get(k, k): v for k, v in point.items()}
+    row.setdefault("timestamp", fallback_ts)
+    return row
+
+
+def _insert(conn, repo_url: str, metrics: dict) -> str:
+    timestamp = metrics.get("timestamp") or datetime.now().isoformat()
+    conn.execute(
+        "INSERT INTO metrics (repo_url, timestamp, stars, view, unique_views, clones, unique_clone) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (repo_url, timestamp, *(int(metrics.get(col) or 0) for col in METRIC_COLUMNS))
+    )
+    return timestamp
+
+
+# urls bound per IN (...) query, well under SQLite's host parameter limit
+SQL_IN_CHUNK = 500
+
+
+def _select_for_repos(conn, sql: str, repo_urls, params=()) -> list:
+    """Rows of sql (with an IN ({}) placeholder for repo_url) for every url, chunked"""
+    urls = list(dict.fromkeys(repo_urls))
+    rows = []
+    for start in range(0, len(urls), SQL_IN_CHUNK):
+        chunk = urls[start:start + SQL_IN_CHUNK]
+        rows.extend(conn.execute(sql.format(", ".join("?" * len(chunk))), (*params, *chunk)).fetchall())
+    return rows
+
+
+def get_connection():
+    """Per-thread connection to the metrics database"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(METRICS_DB, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if METRICS_DB not in _initialized:
+                _init_db(conn)
+                _initialized.add(METRICS_DB)
+        _local.conn = conn
+    return conn
+
+
+def _point(row) -> dict:
+    point = {col: row[col] for col in METRIC_COLUMNS}
+    point["timestamp"] = row["timestamp"]
+    return point
+
+
+@timed_storage
+def load_previous_metrics(repo_url: str):
+    """Latest stored point for a repo, or None"""
+    row = get_connection().execute(
+        "SELECT * FROM metrics WHERE repo_url = ? ORDER BY timestamp DESC, id DESC LIMIT 1",
+        (repo_url,)
+    ).fetchone()
+    return _point(row) if row else None
+
+
+@timed_storage
+def load_recent_metrics(repo_url: str, count: int = 2):
+    """The latest count points for a repo, newest first"""
+    rows = get_connection().execute(
+        "SELECT * FROM metrics WHERE repo_url = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+        (repo_url, count)
+    ).fetchall()
+    return [_point(row) for row in rows]
+
+
+@timed_storage
+def load_history(repo_url: str):
+    """All stored points for a repo, oldest first"""
+    rows = get_connection().execute(
+        "SELECT * FROM metrics WHERE repo_url = ? ORDER BY timestamp, id",
+        (repo_url,)
+    ).fetchall()
+    return [_point(row) for row in rows]
+
+
+@timed_storage
+def query_history(repo_url: str, start: str = None, end: str = None,
+                  resolution: str = "raw", limit: int = None):
+    """History points in [start, end), at most limit of the newest, oldest first.
+
+    resolution "raw" returns stored points; "hour" / "day" return rollup
+    buckets with the last value of each metric plus <metric>_min/_max.
+    """
+    start = start or "0000"
+    end = end or "9999"
+    limit = limit or -1
+    conn = get_connection()
+    if resolution == "raw":
+        rows = conn.execute(
+            "SELECT * FROM metrics WHERE repo_url = ? AND timestamp >= ? AND timestamp < ? "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (repo_url, start, end, limit)
+        ).fetchall()
+        return [_point(row) for row in reversed(rows)]
+
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    rows = conn.execute(
+        "SELECT * FROM metrics_rollup WHERE repo_url = ? AND resolution = ? AND bucket >= ? AND bucket < ? "
+        "ORDER BY bucket DESC LIMIT ?",
+        (repo_url, resolution, start, end, limit)
+    ).fetchall()
+    points = []
+    for row in reversed(rows):
+        point = {"timestamp": row["bucket"], "samples": row["samples"]}
+        for col in METRIC_COLUMNS:
+            point[col] = row[f"{col}_last"]
+            point[f"{col}_min"] = row[f"{col}_min"]
+            point[f"{col}_max"] = row[f"{col}_max"]
+        points.append(point)
+    return points
+
+
+@timed_storage
+def save_current_metrics(repo_url: str, metrics: dict):
+    """Append one point to a repo's history, its rollups and its dashboard summary"""
+    conn = get_connection()
+    with conn:
+        timestamp = _insert(conn, repo_url, metrics)
+        _rollup(conn, repo_url, metrics, timestamp)
+        _refresh_summary(conn, repo_url, metrics, timestamp)
+
+
+@timed_storage
+def delete_repo_metrics(repo_url: str):
+    """Drop all stored history for a repo"""
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM repo_summary WHERE repo_url = ?", (repo_url,))
+        conn.execute("DELETE FROM metrics WHERE repo_url = ?", (repo_url,))
+        conn.execute("DELETE FROM metric_fetches WHERE repo_url = ?", (repo_url,))
+        conn.execute("DELETE FROM traffic_daily WHERE repo_url = ?", (repo_url,))
+        conn.execute("DELETE FROM metrics_rollup WHERE repo_url = ?", (repo_url,))
+        conn.execute("DELETE FROM commits WHERE repo_url = ?", (repo_url,))
+        conn.execute("DELETE FROM commit_cursor WHERE repo_url = ?", (repo_url,))
+        for table in ("stargazers", "star_backfill", "star_pages", "metric_stats"):
+            conn.execute(f"DELETE FROM {table} WHERE repo_url = ?", (repo_url,))
+
+
+@timed_storage
+def save_fetch(repo_url: str, metric: str, payload: dict):
+    """Remember the last value fetched from GitHub for one metric"""
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO metric_fetches (repo_url, metric, payload, fetched_at) VALUES (?, ?, ?, ?)",
+            (repo_url, metric, json.dumps(payload), time.time())
+        )
+
+
+@timed_storage
+def load_fresh_fetch(repo_url: str, metric: str, ttl: float):
+    """Last fetched value for a metric if it is younger than ttl seconds, else None"""
+    if ttl <= 0:
+        return None
+    row = get_connection().execute(
+        "SELECT payload FROM metric_fetches WHERE repo_url = ? AND metric = ? AND fetched_at > ?",
+        (repo_url, metric, time.time() - ttl)
+    ).fetchone()
+    return json.loads(row["payload"]) if row else None
+
+
+@timed_storage
+def load_fetches(repo_urls, metric: str) -> dict:
+    """Last fetched value of metric for each of repo_urls, regardless of age"""
+    rows = _select_for_repos(
+        get_connection(), "SELECT repo_url, payload FROM metric_fetches WHERE metric = ? AND repo_url IN ({})",
+        repo_urls, (metric,)
+    )
+    return {row["repo_url"]: json.loads(row["payload"]) for row in rows}
+
+
+# column pairs filled from the views[] / clones[] arrays of the traffic endpoints
+DAILY_COLUMNS = {"views": ("views", "unique_views"), "clones": ("clones", "unique_clones")}
+
+
+@timed_storage
+def upsert_daily_traffic(repo_url: str, kind: str, points) -> int:
+    """Fold GitHub's 14-day per-day breakdown into traffic_daily.
+
+    Days before the last one already stored are final on GitHub's side
+    and skipped; the last stored day (usually a partial "today") and
+    anything newer are upserted. Returns the number of days written.
+    """
+    count_col, uniques_col = DAILY_COLUMNS[kind]
+    conn = get_connection()
+    last_day = conn.execute(
+        f"SELECT MAX(day) FROM traffic_daily WHERE repo_url = ? AND {count_col} IS NOT NULL",
+        (repo_url,)
+    ).fetchone()[0]
+    rows = []
+    for point in points or []:
+        day = point.get("timestamp", "")[:10]
+        if not day or (last_day and day < last_day):
+            continue
+        rows.append((repo_url, day, int(point.get("count", 0)), int(point.get("uniques", 0))))
+    if rows:
+        with conn:
+            conn.executemany(
+                f"INSERT INTO traffic_daily (repo_url, day, {count_col}, {uniques_col}) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT(repo_url, day) DO UPDATE SET "
+                f"{count_col} = excluded.{count_col}, {uniques_col} = excluded.{uniques_col}",
+                rows
+            )
+    return len(rows)
+
+
+@timed_storage
+def load_daily_traffic(repo_url: str, start: str = None, end: str = None):
+    """Per-day traffic between start and end (YYYY-MM-DD, inclusive), oldest first"""
+    rows = get_connection().execute(
+        "SELECT day, views, unique_views, clones, unique_clones FROM traffic_daily "
+        "WHERE repo_url = ? AND day >= ? AND day <= ? ORDER BY day",
+        (repo_url, start or "0000-00-00", end or "9999-99-99")
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@timed_storage
+def sum_daily_traffic(repo_url: str, start: str = None, end: str = None) -> dict:
+    """Totals over a day range; unique counts can't be summed across days so they are left out"""
+    row = get_connection().execute(
+        "SELECT COUNT(*) AS days, COALESCE(SUM(views), 0) AS views, COALESCE(SUM(clones), 0) AS clones "
+        "FROM traffic_daily WHERE repo_url = ? AND day >= ? AND day <= ?",
+        (repo_url, start or "0000-00-00", end or "9999-99-99")
+    ).fetchone()
+    return dict(row)
+
+
+@timed_storage
+def load_repo_summaries(repo_urls) -> dict:
+    """Materialized latest values and growth per repo, keyed by url"""
+    rows = _select_for_repos(get_connection(), "SELECT * FROM repo_summary WHERE repo_url IN ({})", repo_urls)
+    return {
+        row["repo_url"]: {
+            "timestamp": row["timestamp"],
+            "stars": row["stars"],
+            "views": row["view"],
+            "clones": row["clones"],
+            "growth": json.loads(row["growth"])
+        }
+        for row in rows
+    }
+
+
+def commit_date(commit: dict) -> str:
+    """Committer date of a GitHub commit payload, the date `since=` filters on"""
+    info = commit.get("commit") or {}
+    return (info.get("committer") or info.get("author") or {}).get("date") or ""
+
+
+def _commit_row(repo_url: str, commit: dict):
+    info = commit.get("commit") or {}
+    return (
+        repo_url,
+        commit["sha"],
+        commit_date(commit),
+        (commit.get("author") or {}).get("login"),
+        (info.get("author") or {}).get("name"),
+        json.dumps(commit)
+    )
+
+
+@timed_storage
+def save_commits(repo_url: str, commits, cursor: dict = None) -> int:
+    """Store GitHub commit payloads, already known shas are skipped.
+
+    cursor ({"last_sha", "last_date"}) is saved in the same transaction so
+    an interrupted ingest is simply redone. Returns the number of new commits.
+    """
+    conn = get_connection()
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO commits (repo_url, sha, committed_at, author_login, author_name, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [_commit_row(repo_url, c) for c in commits if c.get("sha")]
+        )
+        added = conn.total_changes - before
+        if cursor:
+            conn.execute(
+                "INSERT OR REPLACE INTO commit_cursor (repo_url, last_sha, last_date, synced_at) VALUES (?, ?, ?, ?)",
+                (repo_url, cursor["last_sha"], cursor["last_date"], time.time())
+            )
+    return added
+
+
+@timed_storage
+def load_commit_cursor(repo_url: str):
+    """{"last_sha", "last_date", "synced_at"} of the newest ingested commit, None if never ingested"""
+    row = get_connection().execute(
+        "SELECT last_sha, last_date, synced_at FROM commit_cursor WHERE repo_url = ?", (repo_url,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+@timed_storage
+def query_commits(repo_url: str, author: str = None, since: str = None, until: str = None,
+                  limit: int = 30, before: tuple = None):
+    """Stored commit payloads, newest first.
+
+    author matches the GitHub login or the git author name; since/until
+    are ISO timestamps (until exclusive); before is the (committed_at, sha)
+    of the last commit of the previous page.
+    """
+    clauses = ["repo_url = ?", "committed_at >= ?", "committed_at < ?"]
+    params = [repo_url, since or "", until or "9999"]
+    if author:
+        clauses.append("(author_login = ? OR author_name = ?)")
+        params.extend([author, author])
+    if before:
+        clauses.append("(committed_at < ? OR (committed_at = ? AND sha < ?))")
+        params.extend([before[0], before[0], before[1]])
+    rows = get_connection().execute(
+        f"SELECT committed_at, sha, payload FROM commits WHERE {' AND '.join(clauses)} "
+        "ORDER BY committed_at DESC, sha DESC LIMIT ?",
+        (*params, limit)
+    ).fetchall()
+    return [json.loads(row["payload"]) for row in rows]
+
+
+@timed_storage
+def save_star_page(repo_url: str, page: int, stargazers, size: int):
+    """Store one stargazer page ([(login, starred_at)]) and checkpoint it.
+
+    Stargazers are keyed by login, so a user seen on two pages (the list
+    shifted after an unstar, or an overlapping refetch) is counted once.
+    """
+    conn = get_connection()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO stargazers (repo_url, login, starred_at) VALUES (?, ?, ?)",
+            [(repo_url, login, starred_at) for login, starred_at in stargazers]
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO star_pages (repo_url, page, size) VALUES (?, ?, ?)",
+            (repo_url, page, size)
+        )
+
+
+@timed_storage
+def load_star_pages(repo_url: str) -> dict:
+    """{page: number of stargazers it had} for every checkpointed page"""
+    rows = get_connection().execute(
+        "SELECT page, size FROM star_pages WHERE repo_url = ?", (repo_url,)
+    ).fetchall()
+    return {row["page"]: row["size"] for row in rows}
+
+
+@timed_storage
+def save_star_backfill(repo_url: str, total_pages: int, status: str):
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO star_backfill (repo_url, total_pages, status, updated_at) VALUES (?, ?, ?, ?)",
+            (repo_url, total_pages, status, time.time())
+        )
+
+
+@timed_storage
+def load_star_backfill(repo_url: str):
+    """Backfill progress for a repo, None if it never ran"""
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT total_pages, status, updated_at FROM star_backfill WHERE repo_url = ?", (repo_url,)
+    ).fetchone()
+    if not row:
+        return None
+    pages = conn.execute("SELECT COUNT(*) FROM star_pages WHERE repo_url = ?", (repo_url,)).fetchone()[0]
+    stars = conn.execute("SELECT COUNT(*) FROM stargazers WHERE repo_url = ?", (repo_url,)).fetchone()[0]
+    return {
+        "status": row["status"],
+        "total_pages": row["total_pages"],
+        "pages_done": pages,
+        "stars_seen": stars,
+        "updated_at": datetime.fromtimestamp(row["updated_at"]).isoformat()
+    }
+
+
+@timed_storage
+def load_star_series(repo_url: str, start: str = None, end: str = None):
+    """Daily new and cumulative stars between start and end (YYYY-MM-DD, inclusive)"""
+    conn = get_connection()
+    start = start or "0000-00-00"
+    total = conn.execute(
+        "SELECT COUNT(*) FROM stargazers WHERE repo_url = ? AND starred_at < ?", (repo_url, start)
+    ).fetchone()[0]
+    rows = conn.execute(
+        "SELECT substr(starred_at, 1, 10) AS day, COUNT(*) AS new_stars FROM stargazers "
+        "WHERE repo_url = ? AND starred_at >= ? AND substr(starred_at, 1, 10) <= ? "
+        "GROUP BY day ORDER BY day",
+        (repo_url, start, end or "9999-99-99")
+    ).fetchall()
+    series = []
+    for row in rows:
+        total += row["new_stars"]
+        series.append({"day": row["day"], "new_stars": row["new_stars"], "stars": total})
+    return series
+
+
+_STAT_FIELDS = ("count", "mean", "var", "last_value", "last_at")
+
+
+def _load_metric_stats(conn, repo_url: str) -> dict:
+    rows = conn.execute(
+        "SELECT metric, %s FROM metric_stats WHERE repo_url = ?" % ", ".join(_STAT_FIELDS), (repo_url,)
+    ).fetchall()
+    return {row["metric"]: {k: row[k] for k in _STAT_FIELDS} for row in rows}
+
+
+@timed_storage
+def load_metric_stats(repo_url: str) -> dict:
+    """Rolling statistics per metric for a repo, {metric: {count, mean, var, last_value, last_at}}"""
+    return _load_metric_stats(get_connection(), repo_url)
+
+
+@timed_storage
+def update_metric_stats(repo_url: str, update) -> dict:
+    """Read-modify-write a repo's rolling statistics as one write transaction.
+
+    update(stats) returns the new stats. The collector and a manual sync
+    can persist the same repo at once; the second waits for the first
+    instead of overwriting its update.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        stats = update(_load_metric_stats(conn, repo_url))
+        now = datetime.now().isoformat()
+        conn.executemany(
+            "INSERT OR REPLACE INTO metric_stats (repo_url, metric, count, mean, var, last_value, last_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(repo_url, metric, s["count"], s["mean"], s["var"], s["last_value"], s.get("last_at"), now)
+             for metric, s in stats.items()]
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return stats
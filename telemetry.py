@@ -0,0 +1,284 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms live in one registry and are rendered
+by the Flask /metrics route. Recording is a dict lookup, a lock and an
+add (plus a bisect for histograms), so it is cheap enough for every
+GitHub call, LLM completion, storage query and graph node.
+
+    GITHUB_REQUESTS.labels(endpoint="/repos/{owner}/{repo}", status="200").inc()
+    with STORAGE_SECONDS.labels(op="load_history").time():
+        ...
+"""
+
+import time
+import bisect
+import threading
+from functools import wraps
+
+# seconds, covers SQLite reads up to a slow LLM completion
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{v}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Timer:
+    """Context manager and decorator observing elapsed seconds"""
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self._t0)
+        return False
+
+    def __call__(self, fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.child):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def labels(self, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        # unlabelled metrics are used directly
+        return self.labels()
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+    _new_child = _CounterChild
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+
+class _GaugeChild(_CounterChild):
+    def set(self, value: float):
+        with self._lock:
+            self.value = float(value)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    _new_child = _GaugeChild
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def render(self, name, labelnames, key):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(labelnames, key, [("le", _format_value(bound))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, key)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def on_collect(self, fn):
+        """fn() runs before every render, e.g. to refresh gauges from live objects"""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics)
+        for fn in collectors:
+            try:
+                fn()
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# metrics shared across modules
+
+NODE_SECONDS = Histogram(
+    "gittracker_node_seconds", "Graph node run time", ["node"]
+)
+NODE_ERRORS = Counter(
+    "gittracker_node_errors_total", "Graph node runs that raised", ["node"]
+)
+GITHUB_REQUESTS = Counter(
+    "gittracker_github_requests_total", "GitHub API responses", ["endpoint", "method", "status"]
+)
+GITHUB_SECONDS = Histogram(
+    "gittracker_github_request_seconds", "GitHub API round trip time", ["endpoint", "method"]
+)
+LLM_SECONDS = Histogram(
+    "gittracker_llm_seconds", "LLM completion time", ["kind"]
+)
+LLM_TOKENS = Counter(
+    "gittracker_llm_tokens_total", "LLM tokens reported by the provider", ["kind", "type"]
+)
+LLM_CACHE_HITS = Counter(
+    "gittracker_llm_cache_hits_total", "Completions answered from the memo cache", ["kind"]
+)
+STORAGE_SECONDS = Histogram(
+    "gittracker_storage_seconds", "Metric store operation time", ["op"]
+)
+SMTP_SECONDS = Histogram(
+    "gittracker_smtp_seconds", "SMTP connect and send time", ["op"]
+)
+RATE_LIMIT_REMAINING = Gauge(
+    "gittracker_github_rate_limit_remaining", "GitHub requests left in the current window", ["resource"]
+)
+RATE_LIMIT_LIMIT = Gauge(
+    "gittracker_github_rate_limit_limit", "GitHub requests allowed per window", ["resource"]
+)
+UPSTREAM_ATTEMPTS = Counter(
+    "gittracker_upstream_attempts_total", "Upstream call attempts by outcome", ["host", "outcome"]
+)
+CIRCUIT_STATE = Gauge(
+    "gittracker_circuit_state", "Circuit breaker state (0 closed, 1 half open, 2 open)", ["host"]
+)
+ANOMALIES = Counter(
+    "gittracker_anomalies_total", "Metric observations flagged as anomalous", ["metric", "direction"]
+)
+
+
+def timed_node(name: str, fn):
+    """Wrap a graph node so every run lands in NODE_SECONDS"""
+    seconds = NODE_SECONDS.labels(node=name)
+    errors = NODE_ERRORS.labels(node=name)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - t0)
+    return wrapper
+
+
+def timed_storage(fn):
+    """Decorator recording a storage function under its own name"""
+    return STORAGE_SECONDS.labels(op=fn.__name__).time()(fn)
+
+
+def render() -> str:
+    return REGISTRY.render()
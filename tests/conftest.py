@@ -0,0 +1,64 @@
+"""
+Shared test setup.
+
+Every database and cache file points into a throwaway directory before
+any project module is imported, and GitHub requests go to a port
+nothing listens on, so tests never touch real data or the network.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+DATA_DIR = tempfile.mkdtemp(prefix="gittracker-tests-")
+os.environ["METRICS_DB"] = os.path.join(DATA_DIR, "metrics.db")
+os.environ["GITHUB_CACHE_FILE"] = os.path.join(DATA_DIR, "github_cache.db")
+os.environ["LLM_CACHE_FILE"] = os.path.join(DATA_DIR, "llm_cache.db")
+os.environ["GITHUB_API_URL"] = "http://127.0.0.1:9"
+os.environ["UPSTREAM_RETRIES"] = "0"
+os.environ.pop("SMTP_HOST", None)
+
+_repo_counter = iter(range(1, 1_000_000))
+
+
+@pytest.fixture
+def repo_url():
+    """A repo url no other test has written metrics for"""
+    return f"https://github.com/tests/repo{next(_repo_counter)}"
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """backend/api.py with an empty repo registry in tmp_path"""
+    for module in ("flask", "flask_cors", "dotenv", "requests"):
+        pytest.importorskip(module)
+    import api as api_module
+    from registry import RepoRegistry
+    monkeypatch.setattr(api_module, "registry", RepoRegistry(str(tmp_path / "repos.json")))
+    api_module.app.config["TESTING"] = True
+    return api_module
+
+
+@pytest.fixture
+def fake_upstreams(monkeypatch):
+    """GitHub and the chat model replaced by the benchmark fakes, returns the fake GitHub"""
+    pytest.importorskip("langgraph")
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    from fake_github import FakeGitHub
+    from fake_llm import FakeChatModel
+    import agent
+    import github_client
+
+    server = FakeGitHub(latency=0).start()
+    monkeypatch.setattr(github_client, "GITHUB_API_URL", server.url)
+    monkeypatch.setattr(github_client, "GITHUB_GRAPHQL_URL", f"{server.url}/graphql")
+    model = FakeChatModel(first_token_latency=0, token_latency=0, tokens=20)
+    monkeypatch.setattr(agent, "get_model", lambda: model)
+    yield server
+    server.stop()
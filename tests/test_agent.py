@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+import agent
+from anomaly import ANOMALY_MIN_SAMPLES
+from github_client import GitHubError
+from rate_limit import RateLimitExceeded
+from llm_cache import MemoCache
+from storage import save_fetch
+
+
+class StubModel:
+    """Chat model whose structured output is fixed; plain calls are numbered"""
+
+    def __init__(self, structured):
+        self.structured = structured
+        self.prompts = []
+
+    def with_structured_output(self, schema):
+        return SimpleNamespace(invoke=lambda prompt: self.structured)
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(content=f"text {len(self.prompts)}")
+
+
+METRICS = {"stars": 10, "view": 5, "unique_views": 2, "clones": 1, "unique_clone": 1}
+
+
+def test_fetch_failed_classifies_errors():
+    assert agent.fetch_failed("views", GitHubError(403, "Must have push access"))["freshness"] == {"views": "unavailable"}
+    assert agent.fetch_failed("views", GitHubError(404, "Not Found"))["freshness"] == {"views": "unavailable"}
+    assert agent.fetch_failed("views", GitHubError(502, "Bad Gateway"))["freshness"] == {"views": "failed"}
+    assert agent.fetch_failed("stars", RateLimitExceeded(0))["freshness"] == {"stars": "failed"}
+
+
+def test_persist_keeps_stars_when_traffic_is_unavailable(repo_url):
+    state = {
+        "repo_url": repo_url,
+        "stars": 42,
+        "fetch_errors": ["views: 403", "clones: 403"],
+        "freshness": {"stars": "fresh", "views": "unavailable", "clones": "unavailable"}
+    }
+    agent.persist_metrics(state)
+    agent.persist_metrics({**state, "stars": 43})
+
+    points = agent.load_history(repo_url)
+    assert [p["stars"] for p in points] == [42, 43]
+    assert points[-1]["view"] == 0
+
+
+def test_persist_carries_forward_unavailable_fields(repo_url):
+    agent.persist_metrics({"repo_url": repo_url, "stars": 1, "view": 30, "unique_views": 9,
+                           "clones": 4, "unique_clone": 2})
+    agent.persist_metrics({
+        "repo_url": repo_url, "stars": 2,
+        "fetch_errors": ["views: 404"],
+        "freshness": {"stars": "fresh", "views": "unavailable", "clones": "fresh"},
+        "clones": 5, "unique_clone": 3
+    })
+    latest = agent.load_history(repo_url)[-1]
+    assert (latest["stars"], latest["view"], latest["unique_views"], latest["clones"]) == (2, 30, 9, 5)
+
+
+def test_persist_skips_transient_failures(repo_url):
+    result = agent.persist_metrics({
+        "repo_url": repo_url, "stars": 5,
+        "fetch_errors": ["views: rate limited"],
+        "freshness": {"stars": "fresh", "views": "failed"}
+    })
+    assert result == {}
+    assert agent.load_history(repo_url) == []
+    assert agent.fetch_incomplete({"fetch_errors": ["stars: boom"]})
+
+
+def test_gating_summarizes_until_baselines_exist(repo_url, monkeypatch):
+    monkeypatch.setattr(agent, "LLM_GENERATION_MODE", "separate")
+    state = {"repo_url": repo_url, "only_if_eventful": True, "anomalies": []}
+    assert agent.generation_router(state) == "summary"
+
+    for i in range(ANOMALY_MIN_SAMPLES):
+        agent.observe_anomalies(repo_url, {"view": 10, "timestamp": f"2024-01-01T{i:02d}:00:00"})
+    assert agent.generation_router(state) == "skip"
+    assert agent.generation_router({**state, "anomalies": [{"metric": "view"}]}) == "summary"
+    assert agent.generation_router({**state, "only_if_eventful": False}) == "summary"
+
+
+def test_failed_fetch_skips_generation(repo_url):
+    state = {"repo_url": repo_url, "fetch_errors": ["stars: timed out"], "freshness": {"stars": "failed"}}
+    assert agent.generation_router(state) == "skip"
+
+
+def test_reused_values_dont_move_baselines(repo_url, monkeypatch):
+    observed = []
+    monkeypatch.setattr(agent, "observe_anomalies", lambda url, values: observed.append(values) or [])
+    agent.persist_metrics({
+        "repo_url": repo_url, "stars": 7, "view": 3, "unique_views": 1, "clones": 2, "unique_clone": 1,
+        "freshness": {"stars": "batched", "views": "reused", "clones": "fresh"}
+    })
+    assert set(observed[0]) == {"stars", "clones", "unique_clone", "timestamp"}
+    assert agent.load_history(repo_url)[-1]["view"] == 3
+
+
+def test_valid_bundle_needs_every_field():
+    assert agent.valid_bundle({"summary": "s", "linkedin_post": "l", "x_post": "x"})
+    assert not agent.valid_bundle({"summary": "s", "linkedin_post": " ", "x_post": "x"})
+    assert not agent.valid_bundle({"summary": "s", "linkedin_post": "l"})
+    assert not agent.valid_bundle(None)
+
+
+def test_combined_generation_returns_all_posts_and_memoizes(repo_url, tmp_path, monkeypatch):
+    model = StubModel({"summary": "s", "linkedin_post": "l", "x_post": "x"})
+    monkeypatch.setattr(agent, "get_model", lambda: model)
+    monkeypatch.setattr(agent, "llm_cache", MemoCache(str(tmp_path / "llm.db")))
+    state = {"repo_url": repo_url, "social_type": "x", **METRICS}
+
+    result = agent.combined_generation(state)
+    assert result == {"summary_ans": "s", "posts": {"linkedin": "l", "x": "x"}, "post": "x"}
+    model.structured = None
+    assert agent.combined_generation(state) == result
+
+
+def test_invalid_structured_output_falls_back_to_separate_calls(repo_url, tmp_path, monkeypatch):
+    model = StubModel({"summary": "s", "linkedin_post": "", "x_post": "x"})
+    monkeypatch.setattr(agent, "get_model", lambda: model)
+    monkeypatch.setattr(agent, "llm_cache", MemoCache(str(tmp_path / "llm.db")))
+
+    result = agent.combined_generation({"repo_url": repo_url, "social_type": "linkedin", **METRICS})
+    assert result == {"summary_ans": "text 1", "post": "text 2"}
+    assert len(model.prompts) == 2
+
+
+def test_fetch_within_ttl_is_reused(repo_url, monkeypatch):
+    monkeypatch.setitem(agent.METRIC_TTLS, "views", 3600)
+    save_fetch(repo_url, "views", {"view": 30, "unique_views": 9})
+    state = {"repo_url": repo_url}
+
+    assert agent.reuse_fresh(state, "views") == {"view": 30, "unique_views": 9, "freshness": {"views": "reused"}}
+    assert agent.reuse_fresh({**state, "force_refresh": True}, "views") is None
+    assert agent.reuse_fresh(state, "clones") is None
+    monkeypatch.setitem(agent.METRIC_TTLS, "views", 0)
+    assert agent.reuse_fresh(state, "views") is None
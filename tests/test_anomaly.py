@@ -0,0 +1,71 @@
+import math
+import random
+import threading
+from datetime import datetime, timedelta
+
+import anomaly
+from storage import load_metric_stats
+
+START = datetime(2024, 3, 1, 12, 0, 0)
+
+
+def snapshot(hours, stars, view=200):
+    return {
+        "stars": stars, "view": view, "unique_views": 50, "clones": 30, "unique_clone": 10,
+        "timestamp": (START + timedelta(hours=hours)).isoformat()
+    }
+
+
+def test_update_tracks_mean_and_variance():
+    stat = {"count": 0, "mean": 0.0, "var": 0.0}
+    stat, diff, z = anomaly.update(stat, 10)
+    assert (stat["count"], stat["mean"], diff, z) == (1, 10.0, 0.0, 0.0)
+    stat, diff, z = anomaly.update(stat, 10)
+    assert stat["var"] == 0 and z == 0
+    stat, diff, z = anomaly.update(stat, 20, alpha=0.5)
+    assert diff == 10 and math.isinf(z)
+    assert stat["mean"] == 15.0 and stat["var"] == 25.0
+
+
+def test_observe_flags_spikes_after_warmup(repo_url):
+    rng = random.Random(1)
+    stars = 100
+    for i in range(30):
+        stars += rng.randint(1, 3)
+        flagged = anomaly.observe(repo_url, snapshot(i, stars, view=200 + rng.randint(-3, 3)))
+        assert flagged == [] or i >= anomaly.ANOMALY_MIN_SAMPLES
+    flagged = anomaly.observe(repo_url, snapshot(30, stars + 80, view=900))
+    assert {a["metric"]: a["direction"] for a in flagged} == {"stars": "spike", "view": "spike"}
+    assert all(isinstance(anomaly.describe(a), str) for a in flagged)
+    # the first snapshot only sets the baseline for the star rate
+    assert load_metric_stats(repo_url)["stars"]["count"] == 30
+
+
+def test_star_rate_is_normalized_by_elapsed_time(repo_url):
+    # two stars every hour, then a two-day gap with the same pace
+    stars = 0
+    for i in range(20):
+        stars += 2
+        anomaly.observe(repo_url, snapshot(i, stars))
+    assert anomaly.observe(repo_url, snapshot(19 + 48, stars + 96)) == []
+    assert round(load_metric_stats(repo_url)["stars"]["mean"]) == 48
+
+
+def test_close_snapshots_fold_into_the_next(repo_url):
+    anomaly.observe(repo_url, snapshot(0, 10))
+    anomaly.observe(repo_url, snapshot(0.01, 11))
+    stats = load_metric_stats(repo_url)["stars"]
+    assert (stats["count"], stats["last_value"]) == (0, 10)
+
+
+def test_concurrent_observations_are_not_lost(repo_url):
+    anomaly.observe(repo_url, snapshot(0, 0))
+    threads = [
+        threading.Thread(target=anomaly.observe, args=(repo_url, snapshot(1 + i, i)))
+        for i in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert load_metric_stats(repo_url)["view"]["count"] == 9
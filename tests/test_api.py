@@ -0,0 +1,199 @@
+import time
+from types import SimpleNamespace
+from datetime import datetime
+
+from storage import save_current_metrics, save_commits
+
+
+class FakeSummaryApp:
+    """Emits what the summary graph streams: one token, then node updates"""
+
+    def __init__(self):
+        self.inputs = None
+
+    def stream(self, inputs, stream_mode):
+        self.inputs = inputs
+        yield "messages", (SimpleNamespace(content="Stars"), {"langgraph_node": "summary"})
+        yield "updates", {"summary": {"summary_ans": "Stars are up"}}
+        yield "updates", {"linkedin_post": {"post": "We grew"}}
+
+
+class FakeMetricsApp:
+    def __init__(self, result):
+        self.result = result
+
+    def invoke(self, inputs):
+        return {"repo_url": inputs["repo_url"], **self.result}
+
+
+FAILED_FETCH = {"fetch_errors": ["stars: timed out"], "freshness": {"stars": "failed"}}
+
+
+def add_repo(client, url, points=(10, 12)):
+    repo = client.post("/api/repos", json={"repo_url": url}).get_json()["repo"]
+    for stars in points:
+        save_current_metrics(url, {
+            "stars": stars, "view": 5, "unique_views": 2, "clones": 1, "unique_clone": 1,
+            "timestamp": datetime.now().isoformat()
+        })
+    return repo
+
+
+def test_metrics_endpoint(api, repo_url):
+    client = api.app.test_client()
+    repo = add_repo(client, repo_url)
+    client.get(f"/api/history/{repo['id']}")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain")
+    body = resp.get_data(as_text=True)
+    assert "# TYPE gittracker_node_seconds histogram" in body
+    assert 'gittracker_storage_seconds_count{op="query_history"}' in body
+
+
+def test_health(api):
+    body = api.app.test_client().get("/api/health").get_json()
+    assert body["status"] == "healthy"
+    assert "circuit_breakers" in body and "collector" in body
+
+
+def test_failed_fetch_serves_last_stored_point(api, repo_url, monkeypatch):
+    client = api.app.test_client()
+    repo = add_repo(client, repo_url)
+    # the collector isn't running, so a recent last_checked doesn't short-circuit
+    api.mark_checked({repo['id']: datetime.now().isoformat()})
+    checked = client.get("/api/repos").get_json()["repos"][0]["last_checked"]
+    monkeypatch.setattr(api, "get_metrics_app", lambda: FakeMetricsApp(FAILED_FETCH))
+
+    body = client.get(f"/api/metrics/{repo['id']}").get_json()
+    assert body["source"] == "store"
+    assert body["current"]["stars"] == 12
+    assert body["previous"]["stars"] == 10
+    assert body["fetch_errors"] == ["stars: timed out"]
+    assert client.get("/api/repos").get_json()["repos"][0]["last_checked"] == checked
+
+    empty = add_repo(client, "https://github.com/tests/never-stored", points=())
+    assert client.get(f"/api/metrics/{empty['id']}").status_code == 503
+
+
+def test_summary_of_failed_fetch_uses_stored_point(api, repo_url, monkeypatch):
+    client = api.app.test_client()
+    repo = add_repo(client, repo_url)
+    captured = {}
+
+    class FakeSummaryInvoke:
+        def invoke(self, inputs):
+            captured.update(inputs)
+            return {"summary_ans": "steady", "post": "post"}
+
+    monkeypatch.setattr(api, "get_metrics_app", lambda: FakeMetricsApp(FAILED_FETCH))
+    monkeypatch.setattr(api, "get_summary_app", lambda: FakeSummaryInvoke())
+    body = client.post(f"/api/summary/{repo['id']}", json={}).get_json()
+    assert captured["stars"] == 12 and "fetch_errors" not in captured
+    assert body["fetch_errors"] == ["stars: timed out"]
+
+    empty = add_repo(client, "https://github.com/tests/never-summarized", points=())
+    assert client.post(f"/api/summary/{empty['id']}", json={}).status_code == 503
+
+
+def test_sync_runs_every_repo_and_reports_done(api, fake_upstreams):
+    client = api.app.test_client()
+    for i in range(3):
+        client.post("/api/repos", json={"repo_url": f"https://github.com/sync/repo{i}"})
+
+    resp = client.post("/api/sync")
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job_id"]
+    deadline = time.time() + 30
+    while True:
+        job = client.get(f"/api/sync/{job_id}").get_json()
+        if job["state"] == "done":
+            break
+        assert time.time() < deadline, job
+        time.sleep(0.05)
+
+    assert job["counts"] == {"success": 3}
+    # no SMTP in tests, but the digest step ran before the job reported done
+    assert job["email_status"] == "skipped_no_config"
+    assert all(r["last_checked"] for r in client.get("/api/repos").get_json()["repos"])
+    assert client.get("/api/sync/unknown").status_code == 404
+
+
+def events(body: str):
+    return [block.split("\n")[0].split(": ", 1)[1] for block in body.strip().split("\n\n")]
+
+
+def test_summary_stream(api, repo_url, monkeypatch):
+    repo = add_repo(api.app.test_client(), repo_url)
+    fake = FakeSummaryApp()
+    monkeypatch.setattr(api, "get_summary_app", lambda: fake)
+
+    resp = api.app.test_client().get(f"/api/summary/{repo['id']}/stream?mode=combined")
+
+    body = resp.get_data(as_text=True)
+    assert resp.mimetype == "text/event-stream"
+    assert "event: error" not in body
+    assert events(body) == ["metrics", "token", "node", "summary", "node", "post", "done"]
+    assert fake.inputs["generation_mode"] == "combined"
+    assert fake.inputs["stars"] == 12
+
+
+def test_summary_stream_unknown_repo(api):
+    resp = api.app.test_client().get("/api/summary/999/stream")
+    assert resp.status_code == 404
+
+
+def test_dashboard_totals_cover_registered_repos(api, repo_url):
+    client = api.app.test_client()
+    add_repo(client, repo_url)
+    # history of a repo that isn't registered
+    save_current_metrics("https://github.com/tests/unregistered", {"stars": 1000, "timestamp": datetime.now().isoformat()})
+    body = client.get("/api/dashboard").get_json()
+    assert body["total_repos"] == 1
+    assert body["total_stars"] == 12
+
+
+def test_history_pages_back_with_next_to(api, repo_url):
+    client = api.app.test_client()
+    repo = add_repo(client, repo_url, points=())
+    for hour in range(5):
+        save_current_metrics(repo_url, {"stars": hour, "timestamp": f"2024-02-01T{hour:02d}:00:00"})
+
+    resp = client.get(f"/api/history/{repo['id']}?limit=2")
+    assert [p["stars"] for p in resp.get_json()] == [3, 4]
+    next_to = resp.headers["X-Next-To"]
+    resp = client.get(f"/api/history/{repo['id']}?limit=2&to={next_to}")
+    assert [p["stars"] for p in resp.get_json()] == [1, 2]
+    assert "X-Next-To" not in client.get(f"/api/history/{repo['id']}").headers
+    resp = client.get(f"/api/history/{repo['id']}?limit=2&from=2024-02-01T03:00:00")
+    assert [p["stars"] for p in resp.get_json()] == [3, 4]
+
+    day = client.get(f"/api/history/{repo['id']}?resolution=day").get_json()
+    assert len(day) == 1 and (day[0]["stars"], day[0]["stars_min"]) == (4, 0)
+    assert client.get(f"/api/history/{repo['id']}?resolution=week").status_code == 400
+    assert client.get(f"/api/history/{repo['id']}?limit=x").status_code == 400
+    assert client.get(f"/api/history/{repo['id']}?limit=0").status_code == 400
+
+
+def test_commits_page_back_with_cursor(api, repo_url):
+    client = api.app.test_client()
+    repo = add_repo(client, repo_url, points=())
+    commits = [
+        {"sha": f"{i:02d}", "commit": {"committer": {"date": f"2024-04-0{1 + i // 2}T00:00:00Z"}},
+         "author": {"login": "alice" if i % 2 else "bob"}}
+        for i in range(5)
+    ]
+    # a stored cursor means reads don't ingest from GitHub first
+    save_commits(repo_url, commits, cursor={"last_sha": "04", "last_date": "2024-04-03T00:00:00Z"})
+
+    resp = client.get(f"/api/commits/{repo['id']}?limit=2")
+    assert [c["sha"] for c in resp.get_json()] == ["04", "03"]
+    resp = client.get(f"/api/commits/{repo['id']}?limit=2&cursor={resp.headers['X-Next-Cursor']}")
+    # 02 and 03 share a date, the sha breaks the tie
+    assert [c["sha"] for c in resp.get_json()] == ["02", "01"]
+    resp = client.get(f"/api/commits/{repo['id']}?limit=2&cursor={resp.headers['X-Next-Cursor']}")
+    assert [c["sha"] for c in resp.get_json()] == ["00"]
+    assert "X-Next-Cursor" not in resp.headers
+
+    assert [c["sha"] for c in client.get(f"/api/commits/{repo['id']}?author=alice").get_json()] == ["03", "01"]
+    assert client.get(f"/api/commits/{repo['id']}?cursor=bad").status_code == 400
@@ -0,0 +1,79 @@
+import time
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+import collector as collector_module
+from collector import Collector
+
+
+class FakeLimiter:
+    def deferred_until(self):
+        return None
+
+
+def make_collector(repos, collect_repo, stars=None):
+    checked = {}
+    c = Collector(lambda: repos, collect_repo, checked.update, FakeLimiter(),
+                  calls_per_repo=4, load_stars=lambda repos: stars or {})
+    c._offset = lambda repo_id: 0.0
+    return c, checked
+
+
+def repo(repo_id, checked_ago=None):
+    last = None if checked_ago is None else (datetime.now() - timedelta(seconds=checked_ago)).isoformat()
+    return {"id": repo_id, "url": f"https://github.com/o/r{repo_id}", "last_checked": last}
+
+
+def test_pick_orders_by_staleness_and_stars():
+    repos = [repo(1, checked_ago=7200), repo(2), repo(3, checked_ago=60), repo(4, checked_ago=7200)]
+    c, _ = make_collector(repos, lambda r: True, stars={4: 1000})
+    picked = [r["id"] for r in c.pick(repos, time.time())]
+    # never collected first, fresh repos left out, stars break the tie
+    assert picked == [2, 4, 1]
+
+
+def test_success_marks_checked():
+    repos = [repo(1)]
+    c, checked = make_collector(repos, lambda r: True)
+    c._run(repos[0])
+    assert 1 in checked
+    assert c.status()["collected"] == 1
+
+
+def test_failure_backs_off_exponentially(monkeypatch):
+    repos = [repo(1), repo(2)]
+    c, checked = make_collector(repos, lambda r: r["id"] != 1)
+    monkeypatch.setattr(collector_module, "COLLECT_RETRY_BASE", 60)
+    monkeypatch.setattr(collector_module, "COLLECT_RETRY_MAX", 1000)
+
+    c._run(repos[0])
+    now = time.time()
+    assert checked == {}
+    assert [r["id"] for r in c.pick(repos, now)] == [2]
+    assert [r["id"] for r in c.pick(repos, now + 61)] == [1, 2]
+
+    c._run(repos[0])
+    assert c._retry_at(1) - time.time() > 110
+    for _ in range(10):
+        c._run(repos[0])
+    assert c._retry_at(1) - time.time() <= 1000
+
+
+def test_crash_counts_as_failure():
+    def boom(r):
+        raise RuntimeError("boom")
+    repos = [repo(1)]
+    c, checked = make_collector(repos, boom)
+    c._run(repos[0])
+    assert c.status()["failed"] == 1
+    assert c.status()["backing_off"] == 1
+    assert checked == {}
+
+
+def test_only_a_running_collector_keeps_repos_fresh():
+    repos = [repo(1, checked_ago=60)]
+    c, _ = make_collector(repos, lambda r: True)
+    assert not c.is_fresh(repos[0])
+    c._thread = SimpleNamespace(is_alive=lambda: True)
+    assert c.is_fresh(repos[0])
+    assert not c.is_fresh(repo(2, checked_ago=7200))
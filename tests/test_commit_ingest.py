@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+import commit_ingest
+from storage import load_commit_cursor, query_commits
+
+START = datetime(2024, 4, 1)
+
+
+def commit(i, login="alice"):
+    date = (START + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "sha": f"sha{i:03d}",
+        "commit": {"committer": {"date": date}, "author": {"name": login.title()}},
+        "author": {"login": login}
+    }
+
+
+class FakeCommits:
+    """GET /repos/{owner}/{repo}/commits: newest first, since and page/per_page"""
+
+    def __init__(self, count):
+        self.commits = [commit(i) for i in range(count)]
+        self.calls = []
+
+    def get(self, path, params=None):
+        self.calls.append(dict(params))
+        since = params.get("since", "")
+        listed = sorted(
+            (c for c in self.commits if c["commit"]["committer"]["date"] >= since),
+            key=lambda c: c["commit"]["committer"]["date"], reverse=True
+        )
+        start = (params["page"] - 1) * params["per_page"]
+        return SimpleNamespace(status_code=200, data=listed[start:start + params["per_page"]],
+                               raise_for_status=lambda: None)
+
+
+@pytest.fixture
+def fake_commits(monkeypatch):
+    fake = FakeCommits(25)
+    monkeypatch.setattr(commit_ingest, "github_get", fake.get)
+    monkeypatch.setattr(commit_ingest, "COMMITS_PER_PAGE", 10)
+    monkeypatch.setattr(commit_ingest, "COMMIT_BACKFILL_PAGES", 3)
+    return fake
+
+
+def test_backfill_then_only_new_commits(repo_url, fake_commits):
+    assert commit_ingest.ingest_commits(repo_url) == 25
+    assert [c["page"] for c in fake_commits.calls] == [1, 2, 3]
+    assert "since" not in fake_commits.calls[0]
+    assert load_commit_cursor(repo_url)["last_sha"] == "sha024"
+
+    fake_commits.commits += [commit(i, login="bob") for i in range(25, 30)]
+    fake_commits.calls.clear()
+    assert commit_ingest.ingest_commits(repo_url) == 5
+    # since backs off by the overlap, paging stops at the page holding the last seen sha
+    assert fake_commits.calls == [{"per_page": 10, "since": "2024-04-01T00:00:00Z", "page": 1}]
+    assert load_commit_cursor(repo_url)["last_sha"] == "sha029"
+    assert [c["sha"] for c in query_commits(repo_url, author="bob", limit=2)] == ["sha029", "sha028"]
+
+
+def test_empty_repo_still_gets_a_cursor(repo_url, monkeypatch):
+    monkeypatch.setattr(commit_ingest, "github_get", lambda path, params=None: SimpleNamespace(
+        status_code=409, data={"message": "Git Repository is empty."}, raise_for_status=lambda: None))
+    assert commit_ingest.ingest_commits(repo_url) == 0
+    assert load_commit_cursor(repo_url)["last_sha"] == ""
@@ -0,0 +1,24 @@
+import github_cache
+from github_cache import ResponseCache
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(github_cache.time, "time", lambda: next(clock))
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("a", {"n": 1}, etag='"a"')
+    cache.put("b", {"n": 2}, etag='"b"')
+    assert cache.get("a") == {"n": 1}
+    cache.put("c", {"n": 3}, last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    assert cache.get("b") is None
+    assert cache.validators("a") == {"If-None-Match": '"a"'}
+    assert cache.validators("c") == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    cache.put("a", {"n": 1})
+    assert cache.validators("a") == {}
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,80 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+import github_client
+from github_cache import ResponseCache
+from github_client import _cache_key, endpoint_label, github_get, GITHUB_API_URL
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Answers every GET with one JSON body, 304 when the ETag matches"""
+    seen = []
+
+    def do_GET(self):
+        self.seen.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"stargazers_count": 7}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server(tmp_path, monkeypatch):
+    ETagHandler.seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(github_client, "response_cache", ResponseCache(str(tmp_path / "cache.db")))
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_not_modified_is_answered_from_the_cache(etag_server):
+    first = github_get(f"{etag_server}/repos/o/r")
+    second = github_get(f"{etag_server}/repos/o/r")
+    assert (first.status_code, first.from_cache) == (200, False)
+    assert (second.status_code, second.from_cache, second.data) == (200, True, {"stargazers_count": 7})
+    assert ETagHandler.seen == [None, '"v1"']
+    assert github_client.response_cache.stats()["hits"] == 1
+
+
+def test_entry_evicted_before_the_304_is_refetched(etag_server, monkeypatch):
+    github_get(f"{etag_server}/repos/o/r")
+    monkeypatch.setattr(github_client.response_cache, "get", lambda key: None)
+    resp = github_get(f"{etag_server}/repos/o/r")
+    assert (resp.status_code, resp.from_cache, resp.data) == (200, False, {"stargazers_count": 7})
+    # the retry goes out without validators
+    assert ETagHandler.seen == [None, '"v1"', None]
+
+
+def test_cache_key_sorts_params():
+    assert _cache_key("u", {"b": 2, "a": 1}) == _cache_key("u", {"a": 1, "b": 2}) == "u?a=1&b=2"
+    assert _cache_key("u") == "u"
+
+
+def test_cache_key_varies_on_representation_headers():
+    plain = _cache_key("u", {"page": 1})
+    star = _cache_key("u", {"page": 1}, {"Accept": "application/vnd.github.star+json"})
+    assert star != plain
+    assert _cache_key("u", {"page": 1}, {"accept": "application/vnd.github.star+json"}) == star
+    # headers that don't change the body don't split the cache
+    assert _cache_key("u", {"page": 1}, {"If-None-Match": '"x"', "User-Agent": "t"}) == plain
+
+
+def test_endpoint_label_hides_repo_names():
+    assert endpoint_label(f"{GITHUB_API_URL}/repos/me/app/traffic/views?x=1") == "/repos/{owner}/{repo}/traffic/views"
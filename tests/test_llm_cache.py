@@ -0,0 +1,34 @@
+import llm_cache
+from llm_cache import MemoCache, make_key
+
+
+def test_key_depends_on_every_part():
+    key = make_key("summary", "1", "model", {"stars": 1})
+    assert key == make_key("summary", "1", "model", {"stars": 1})
+    assert key != make_key("summary", "2", "model", {"stars": 1})
+    assert key != make_key("summary", "1", "other", {"stars": 1})
+    assert key != make_key("summary", "1", "model", {"stars": 2})
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = MemoCache(str(tmp_path / "llm.db"), ttl=100, max_entries=10)
+    cache.put("k", "summary", "text")
+    now[0] += 99
+    assert cache.get("k") == "text"
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(clock)))
+    cache = MemoCache(str(tmp_path / "llm.db"), ttl=1000, max_entries=2)
+    cache.put("a", "summary", "A")
+    cache.put("b", "summary", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "summary", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
@@ -0,0 +1,94 @@
+import socketserver
+import threading
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import notifications
+
+
+class DebugSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept mail: every session and message is recorded"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        session = {"rcpt": [], "messages": []}
+        self.server.sessions.append(session)
+        self.reply("220 localhost debugging server")
+        for raw in self.rfile:
+            command = raw.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command.startswith("RCPT"):
+                session["rcpt"].append(raw.decode().strip())
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data in self.rfile:
+                    if data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data.decode())
+                session["messages"].append("".join(lines))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), DebugSMTPHandler)
+    server.daemon_threads = True
+    server.sessions = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(notifications, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(notifications, "SMTP_PORT", server.server_address[1])
+    monkeypatch.setattr(notifications, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(notifications, "SMTP_USER", None)
+    monkeypatch.setattr(notifications, "NOTIFY_RECIPIENTS", ["a@example.com", "b@example.com"])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+ENTRIES = [{"repo": f"me/app{i}", "summary": f"summary {i}"} for i in range(3)]
+
+
+def test_digest_is_one_message_over_one_connection(smtp_server, monkeypatch):
+    monkeypatch.setattr(notifications, "NOTIFY_MODE", "digest")
+    assert notifications.send_digest(ENTRIES) == "sent"
+
+    [session] = smtp_server.sessions
+    assert len(session["messages"]) == 1
+    assert len(session["rcpt"]) == 2
+    body = session["messages"][0]
+    assert "GitHub summary for 3 repositories" in body
+    assert all(f"=== me/app{i} ===" in body for i in range(3))
+
+
+def test_per_repo_mode_shares_the_connection(smtp_server, monkeypatch):
+    monkeypatch.setattr(notifications, "NOTIFY_MODE", "per_repo")
+    assert notifications.send_digest(ENTRIES) == "sent"
+
+    [session] = smtp_server.sessions
+    assert len(session["messages"]) == 3
+    assert "Subject: Daily Github Summary: me/app1" in session["messages"][1]
+
+
+def test_nothing_to_send_or_nowhere_to_send_it(monkeypatch):
+    assert notifications.send_digest([]) == "skipped_empty"
+    monkeypatch.setattr(notifications, "SMTP_HOST", None)
+    assert notifications.send_digest(ENTRIES) == "skipped_no_config"
+    assert notifications.send_email("s", "b") == "skipped_no_config"
+
+
+def test_repos_with_anomalies_lead_the_digest():
+    entries = ENTRIES[:2] + [{"repo": "me/hot", "summary": "busy day", "anomalies": ["stars spiked"]}]
+    body = notifications.format_digest(entries)
+    assert body.index("=== me/hot ===\n! stars spiked\n\nbusy day") < body.index("=== me/app0 ===")
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from rate_limit import RateLimiter, RateLimitExceeded, is_rate_limited, SECONDARY_BACKOFF
+
+
+def headers(remaining, reset_in=3600, limit=5000):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + reset_in))
+    }
+
+
+def test_unknown_quota_goes_straight_through():
+    limiter = RateLimiter()
+    limiter.acquire()
+    assert limiter.status()["remaining"] is None
+
+
+def test_bucket_mirrors_headers_and_takes_tokens():
+    limiter = RateLimiter(reserve=10, low_water=100)
+    limiter.update(headers(4000))
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.remaining == 3998
+    assert limiter.status()["limit"] == 5000
+
+
+def test_spreads_requests_when_low():
+    limiter = RateLimiter(reserve=0, low_water=100)
+    limiter.update(headers(10, reset_in=100))
+    now = time.time()
+    assert limiter._delay(now) == 0
+    # ten calls left for 100s: the next slot is ~10s later
+    assert limiter._delay(now) == pytest.approx(10, abs=0.5)
+
+
+def test_exhausted_quota_raises_past_max_wait():
+    limiter = RateLimiter(reserve=50, max_wait=5)
+    limiter.update(headers(50, reset_in=600))
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.acquire()
+    assert exc.value.retry_at == pytest.approx(limiter.reset_at, abs=1)
+    assert limiter.deferred_until() == limiter.reset_at
+
+
+def test_window_rollover_refills():
+    limiter = RateLimiter(reserve=50)
+    limiter.update(headers(0, reset_in=-1))
+    assert limiter._delay(time.time()) == 0
+    assert limiter.remaining == 5000
+
+
+def test_backoff_prefers_retry_after_then_reset_then_exponential():
+    limiter = RateLimiter()
+    assert limiter.backoff({"Retry-After": "30"}) == pytest.approx(30, abs=1)
+
+    limiter = RateLimiter()
+    limiter.update(headers(0, reset_in=120))
+    assert limiter.backoff(headers(0, reset_in=120)) == pytest.approx(120, abs=1)
+
+    limiter = RateLimiter()
+    first = limiter.backoff({})
+    second = limiter.backoff({})
+    assert first == pytest.approx(SECONDARY_BACKOFF, abs=1)
+    assert second == pytest.approx(2 * SECONDARY_BACKOFF, abs=1)
+    # a normal response resets the secondary backoff
+    limiter.update({}, limited=False)
+    assert limiter._secondary_hits == 0
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(429, {})
+    assert is_rate_limited(403, {"X-RateLimit-Remaining": "0"})
+    assert is_rate_limited(403, {}, {"message": "You have exceeded a secondary rate limit"})
+    assert not is_rate_limited(403, {}, {"message": "Must have push access"})
+    assert not is_rate_limited(200, {"X-RateLimit-Remaining": "0"})
+
+
+def test_estimate_finish():
+    limiter = RateLimiter(reserve=0, low_water=10)
+    assert limiter.estimate_finish(5).timestamp() == pytest.approx(time.time(), abs=1)
+    limiter.update(headers(1000, reset_in=600, limit=1000))
+    assert limiter.estimate_finish(500).timestamp() == pytest.approx(time.time(), abs=1)
+    # 500 more than this window allows wait for the reset
+    assert limiter.estimate_finish(1500).timestamp() == pytest.approx(limiter.reset_at, abs=1)
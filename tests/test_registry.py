@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from registry import RepoRegistry
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "connected_repos.json")
+
+
+def test_add_get_remove_and_ids_never_reused(path):
+    registry = RepoRegistry(path)
+    a = registry.add("https://github.com/o/a", "o", "a")
+    b = registry.add("https://github.com/o/b", "o", "b")
+    with pytest.raises(ValueError):
+        registry.add("https://github.com/o/a", "o", "a")
+    assert registry.get_by_url("https://github.com/o/b")["id"] == b["id"]
+
+    assert registry.remove(b["id"])["name"] == "b"
+    assert registry.remove(b["id"]) is None
+    c = registry.add("https://github.com/o/c", "o", "c")
+    assert c["id"] == b["id"] + 1
+    # a new instance reads the same state back
+    assert [r["name"] for r in RepoRegistry(path).all()] == ["a", "c"]
+    assert a["id"] == 1
+
+
+def test_reads_are_copies(path):
+    registry = RepoRegistry(path)
+    repo = registry.add("https://github.com/o/a", "o", "a")
+    registry.get(repo["id"])["name"] = "changed"
+    assert registry.get(repo["id"])["name"] == "a"
+
+
+def test_last_checked_is_batched_and_survives_hand_edits(path):
+    registry = RepoRegistry(path, flush_delay=3600)
+    repo = registry.add("https://github.com/o/a", "o", "a")
+    registry.mark_checked({repo["id"]: "2024-01-01T00:00:00"})
+    with open(path) as f:
+        assert json.load(f)["repos"][0]["last_checked"] is None
+
+    # someone edits the file by hand before the flush
+    with open(path) as f:
+        data = json.load(f)
+    data["repos"].append({"id": 7, "url": "https://github.com/o/b", "owner": "o", "name": "b"})
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+    registry.flush()
+    with open(path) as f:
+        data = json.load(f)
+    assert [r["id"] for r in data["repos"]] == [1, 7]
+    assert data["repos"][0]["last_checked"] == "2024-01-01T00:00:00"
+    assert data["next_id"] == 8
+
+
+def test_reads_the_legacy_list_format(path):
+    with open(path, "w") as f:
+        json.dump([{"id": 3, "url": "https://github.com/o/a", "owner": "o", "name": "a"}], f)
+    registry = RepoRegistry(path)
+    assert registry.get(3)["name"] == "a"
+    assert registry.add("https://github.com/o/b", "o", "b")["id"] == 4
+    with open(path) as f:
+        assert json.load(f)["next_id"] == 5
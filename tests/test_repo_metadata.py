@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+import repo_metadata
+from github_client import GitHubResponse
+from rate_limit import RateLimiter
+
+
+def node(stars):
+    return {"stargazerCount": stars, "forkCount": 1, "watchers": {"totalCount": 2}, "issues": {"totalCount": 3}}
+
+
+@pytest.fixture
+def rest_calls(monkeypatch):
+    calls = []
+
+    def fake_get(path, *args, **kwargs):
+        calls.append(path)
+        return GitHubResponse(200, {"stargazers_count": 7})
+    monkeypatch.setattr(repo_metadata, "github_get", fake_get)
+    return calls
+
+
+URLS = [f"https://github.com/o/r{i}" for i in range(5)]
+
+
+def test_batches_with_rest_fallback_for_missing_repos(monkeypatch, rest_calls):
+    def fake_graphql(query, variables):
+        return GitHubResponse(200, {"data": {"r0": node(10), "r1": None}})
+    monkeypatch.setattr(repo_metadata, "github_graphql", fake_graphql)
+
+    results = repo_metadata.fetch_repo_metadata(URLS[:2], batch_size=2)
+    assert results[URLS[0]]["stars"] == 10
+    assert results[URLS[1]]["stars"] == 7
+    assert rest_calls == ["/repos/o/r1"]
+
+
+def test_graphql_rate_limited_defers_without_rest(monkeypatch, rest_calls):
+    limiter = RateLimiter()
+    monkeypatch.setattr(repo_metadata, "graphql_rate_limiter", limiter)
+    batches = []
+    reset = int(time.time()) + 600
+
+    def fake_graphql(query, variables):
+        batches.append(variables)
+        return GitHubResponse(
+            200,
+            {"data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]},
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": str(reset)}
+        )
+    monkeypatch.setattr(repo_metadata, "github_graphql", fake_graphql)
+    limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+
+    assert repo_metadata.fetch_repo_metadata(URLS, batch_size=2) == {}
+    assert len(batches) == 1
+    assert rest_calls == []
+    assert limiter.blocked_until == reset
@@ -0,0 +1,115 @@
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, call_with_retries, breaker_for
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(resilience.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def is_transient(exc):
+    return isinstance(exc, ConnectionError)
+
+
+class Flaky:
+    """Fails with the given exceptions, then returns 'ok'"""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return "ok"
+
+
+def test_backoff_is_capped_full_jitter():
+    for attempt in range(10):
+        assert 0 <= resilience.backoff_delay(attempt, base=0.5, cap=8) <= min(8, 0.5 * 2 ** attempt)
+
+
+def test_transient_failures_are_retried(no_sleep):
+    fn = Flaky(ConnectionError("reset"), ConnectionError("reset"))
+    assert call_with_retries(fn, "retry.test", is_transient, retries=2) == "ok"
+    assert fn.calls == 3
+    assert len(no_sleep) == 2
+    assert breaker_for("retry.test").status()["consecutive_failures"] == 0
+
+
+def test_gives_up_after_retries():
+    fn = Flaky(*[ConnectionError("down")] * 5)
+    with pytest.raises(ConnectionError):
+        call_with_retries(fn, "giveup.test", is_transient, retries=1)
+    assert fn.calls == 2
+
+
+def test_other_errors_propagate_without_tripping_the_breaker():
+    fn = Flaky(ValueError("bad request"))
+    with pytest.raises(ValueError):
+        call_with_retries(fn, "bug.test", is_transient, retries=3)
+    assert fn.calls == 1
+    assert breaker_for("bug.test").status()["consecutive_failures"] == 0
+
+
+def test_bad_result_is_retried_then_returned():
+    results = iter([503, 503, 503])
+    result = call_with_retries(lambda: next(results), "bad.test", is_transient,
+                               bad_result=lambda r: r >= 500, retries=2)
+    assert result == 503
+    assert breaker_for("bad.test").status()["consecutive_failures"] == 3
+
+
+def test_breaker_opens_fails_fast_and_recovers(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(resilience.time, "time", lambda: clock[0])
+    breaker = CircuitBreaker("breaker.test", failures=2, reset_after=30)
+
+    breaker.allow()
+    breaker.failure()
+    breaker.allow()
+    breaker.failure()
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    clock[0] += 31
+    breaker.allow()  # the single half-open trial
+    assert breaker.state == resilience.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.failure()
+    assert breaker.state == resilience.OPEN and breaker.opened == 2
+
+    clock[0] += 31
+    breaker.allow()
+    breaker.success()
+    assert breaker.state == resilience.CLOSED
+    breaker.allow()
+
+
+def test_release_frees_the_trial_slot(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(resilience.time, "time", lambda: clock[0])
+    breaker = CircuitBreaker("release.test", failures=1, reset_after=10)
+    breaker.failure()
+    clock[0] += 11
+    breaker.allow()
+    breaker.release()
+    breaker.allow()
+    assert breaker.state == resilience.HALF_OPEN
+
+
+def test_open_breaker_short_circuits_calls():
+    breaker = breaker_for("open.test")
+    for _ in range(breaker.max_failures):
+        breaker.failure()
+    fn = Flaky()
+    with pytest.raises(CircuitOpenError):
+        call_with_retries(fn, "open.test", is_transient)
+    assert fn.calls == 0
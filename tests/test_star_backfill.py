@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+import star_backfill
+from storage import load_star_series, get_connection
+
+
+class FakeStargazers:
+    """The star+json stargazer listing, oldest first, 100 per page"""
+
+    def __init__(self, count):
+        self.users = [
+            {"starred_at": f"2024-01-{1 + i // 100:02d}T00:00:{i % 60:02d}Z", "user": {"login": f"user{i}"}}
+            for i in range(count)
+        ]
+        self.fetched = []
+
+    def fetch(self, repo_url, page):
+        self.fetched.append(page)
+        per_page = star_backfill.STARS_PER_PAGE
+        last = -(-len(self.users) // per_page)
+        return SimpleNamespace(
+            data=self.users[(page - 1) * per_page:page * per_page],
+            headers={"Link": f'<https://api.github.com/x?per_page={per_page}&page={last}>; rel="last"'}
+        )
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    fake = FakeStargazers(250)
+    monkeypatch.setattr(star_backfill, "_fetch_page", fake.fetch)
+    return fake
+
+
+def stored_logins(repo_url):
+    rows = get_connection().execute("SELECT login FROM stargazers WHERE repo_url = ?", (repo_url,)).fetchall()
+    return {row["login"] for row in rows}
+
+
+def test_full_backfill(repo_url, listing, monkeypatch):
+    monkeypatch.setattr(star_backfill, "_budget", lambda headroom: 400)
+    progress = star_backfill.backfill_stars(repo_url, concurrency=2)
+    assert progress["status"] == "complete"
+    assert progress["stars_seen"] == 250
+    series = load_star_series(repo_url)
+    assert [p["new_stars"] for p in series] == [100, 100, 50]
+    assert series[-1]["stars"] == 250
+    assert load_star_series(repo_url, start="2024-01-02")[0]["stars"] == 200
+
+
+def test_resume_after_unstar_neither_skips_nor_double_counts(repo_url, listing, monkeypatch):
+    # first run can only afford page 2, page 3 stays pending
+    monkeypatch.setattr(star_backfill, "_budget", lambda headroom: 1)
+    assert star_backfill.backfill_stars(repo_url)["status"] == "partial"
+
+    # an early stargazer leaves: user200 moves from page 3 onto page 2
+    del listing.users[5]
+    listing.fetched.clear()
+    monkeypatch.setattr(star_backfill, "_budget", lambda headroom: 400)
+    progress = star_backfill.backfill_stars(repo_url)
+
+    assert sorted(listing.fetched) == [1, 2, 3]
+    assert progress["status"] == "complete"
+    assert {u["user"]["login"] for u in listing.users} <= stored_logins(repo_url)
+    # user5 was seen before leaving, everybody else exactly once
+    assert progress["stars_seen"] == 250
+    assert load_star_series(repo_url)[-1]["stars"] == 250
+
+
+def test_pages_to_fetch_adds_overlap():
+    full = star_backfill.STARS_PER_PAGE
+    done = {1: full, 2: full, 3: full, 4: 40, 5: full}
+    assert star_backfill._pages_to_fetch(6, done) == [3, 4, 5, 6]
+    assert star_backfill._pages_to_fetch(1, {1: 3}) == []
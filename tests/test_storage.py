@@ -0,0 +1,137 @@
+import json
+from datetime import datetime, timedelta
+
+import storage
+from storage import (
+    save_current_metrics,
+    load_previous_metrics,
+    load_history,
+    save_fetch,
+    load_fetches,
+    load_repo_summaries,
+    query_history,
+    delete_repo_metrics,
+    upsert_daily_traffic,
+    load_daily_traffic,
+    sum_daily_traffic
+)
+
+
+def point(stars, ts=None, **values):
+    return {
+        "stars": stars, "view": values.get("view", 0), "unique_views": 0,
+        "clones": values.get("clones", 0), "unique_clone": 0,
+        "timestamp": ts or datetime.now().isoformat()
+    }
+
+
+def test_lookups_by_repo_are_chunked(monkeypatch):
+    monkeypatch.setattr(storage, "SQL_IN_CHUNK", 2)
+    urls = [f"https://github.com/chunk/r{i}" for i in range(5)]
+    for i, url in enumerate(urls):
+        save_current_metrics(url, point(i))
+        save_fetch(url, "metadata", {"forks": i})
+    wanted = urls[:4] + ["https://github.com/chunk/missing"]
+
+    summaries = load_repo_summaries(iter(wanted))
+    assert {url: s["stars"] for url, s in summaries.items()} == {url: i for i, url in enumerate(urls[:4])}
+    fetches = load_fetches(wanted, "metadata")
+    assert fetches == {url: {"forks": i} for i, url in enumerate(urls[:4])}
+    assert load_fetches([], "metadata") == {}
+
+
+def fresh_db(tmp_path):
+    conn = storage.sqlite3.connect(str(tmp_path / "metrics.db"))
+    conn.row_factory = storage.sqlite3.Row
+    return conn
+
+
+def test_json_history_is_migrated_once(tmp_path, monkeypatch):
+    history = tmp_path / "metrics_history.json"
+    history.write_text(json.dumps({
+        # the very first format: one dict per repo with the legacy keys
+        "https://github.com/legacy/one": {"stars": 3, "views": 9, "uni_view": 4, "clone": 2, "uni_clone": 1},
+        "https://github.com/legacy/two": [
+            {"stars": 1, "view": 5, "timestamp": "2024-01-01T10:00:00"},
+            {"stars": 4, "view": 6, "timestamp": "2024-01-02T10:00:00"}
+        ]
+    }))
+    monkeypatch.setattr(storage, "METRICS_FILE", str(history))
+    conn = fresh_db(tmp_path)
+    storage._init_db(conn)
+    storage._init_db(conn)
+
+    rows = conn.execute("SELECT * FROM metrics ORDER BY repo_url, timestamp").fetchall()
+    assert len(rows) == 3
+    one = [r for r in rows if r["repo_url"].endswith("one")][0]
+    assert (one["view"], one["unique_views"], one["clones"], one["unique_clone"]) == (9, 4, 2, 1)
+    # rollups and summaries are built from the imported history
+    summary = conn.execute("SELECT * FROM repo_summary WHERE repo_url = ?", ("https://github.com/legacy/two",)).fetchone()
+    assert summary["stars"] == 4
+    days = conn.execute("SELECT COUNT(*) FROM metrics_rollup WHERE resolution = 'day'").fetchone()[0]
+    assert days == 3
+
+
+def test_history_is_ordered_by_timestamp(repo_url):
+    save_current_metrics(repo_url, point(7, "2024-05-01T11:00:00"))
+    # a late point for an earlier time sorts before it
+    save_current_metrics(repo_url, point(5, "2024-05-01T10:00:00"))
+
+    assert [p["stars"] for p in load_history(repo_url)] == [5, 7]
+    assert load_previous_metrics(repo_url)["stars"] == 7
+
+    delete_repo_metrics(repo_url)
+    assert load_history(repo_url) == []
+    assert load_previous_metrics(repo_url) is None
+
+
+def test_rollups_keep_min_max_last(repo_url):
+    for minute, stars in ((0, 5), (20, 9), (40, 7)):
+        save_current_metrics(repo_url, point(stars, f"2024-05-01T10:{minute:02d}:00"))
+    save_current_metrics(repo_url, point(11, "2024-05-01T11:05:00"))
+    # a late point for an earlier hour doesn't become that hour's last value
+    save_current_metrics(repo_url, point(1, "2024-05-01T10:10:00"))
+
+    hours = query_history(repo_url, resolution="hour")
+    assert [(h["timestamp"], h["samples"]) for h in hours] == [("2024-05-01T10:00:00", 4), ("2024-05-01T11:00:00", 1)]
+    assert (hours[0]["stars_min"], hours[0]["stars_max"], hours[0]["stars"]) == (1, 9, 7)
+    day = query_history(repo_url, resolution="day")
+    assert len(day) == 1 and day[0]["stars"] == 11 and day[0]["samples"] == 5
+    raw = query_history(repo_url, start="2024-05-01T10:15:00", end="2024-05-01T11:00:00")
+    assert [p["stars"] for p in raw] == [9, 7]
+    assert [p["stars"] for p in query_history(repo_url, limit=2)] == [7, 11]
+
+
+def test_summary_growth(repo_url):
+    today = datetime(2024, 6, 30, 12, 0, 0)
+    save_current_metrics(repo_url, point(100, (today - timedelta(days=8)).isoformat(), view=10))
+    save_current_metrics(repo_url, point(110, (today - timedelta(days=1)).isoformat(), view=20))
+    save_current_metrics(repo_url, point(120, today.isoformat(), view=30))
+
+    summary = load_repo_summaries([repo_url])[repo_url]
+    assert (summary["stars"], summary["views"]) == (120, 30)
+    assert summary["growth"]["stars"]["1d"] == {"delta": 10, "pct": 9.1}
+    assert summary["growth"]["stars"]["7d"] == {"delta": 20, "pct": 20.0}
+    assert summary["growth"]["stars"]["30d"] is None
+
+    delete_repo_metrics(repo_url)
+    assert load_repo_summaries([repo_url]) == {}
+    assert query_history(repo_url) == []
+
+
+def traffic(*days):
+    return [{"timestamp": f"2024-03-{day:02d}T00:00:00Z", "count": count, "uniques": count // 2}
+            for day, count in days]
+
+
+def test_daily_traffic_upserts_overlapping_windows(repo_url):
+    assert upsert_daily_traffic(repo_url, "views", traffic((1, 10), (2, 20), (3, 5))) == 3
+    # the next fetch overlaps: final days are skipped, the partial last day is updated
+    assert upsert_daily_traffic(repo_url, "views", traffic((1, 99), (2, 99), (3, 8), (4, 4))) == 2
+    upsert_daily_traffic(repo_url, "clones", traffic((3, 2), (4, 1)))
+
+    days = load_daily_traffic(repo_url)
+    assert [(d["day"], d["views"], d["clones"]) for d in days] == [
+        ("2024-03-01", 10, None), ("2024-03-02", 20, None), ("2024-03-03", 8, 2), ("2024-03-04", 4, 1)
+    ]
+    assert sum_daily_traffic(repo_url, "2024-03-02", "2024-03-03") == {"days": 2, "views": 28, "clones": 2}
@@ -0,0 +1,62 @@
+import time
+import threading
+
+from sync_jobs import SyncJobManager
+
+
+def wait_done(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done:
+        assert time.time() < deadline, "job never finished"
+        time.sleep(0.01)
+    return job.to_dict()
+
+
+def repos(n):
+    return [{"id": i, "name": f"r{i}", "url": f"https://github.com/o/r{i}"} for i in range(1, n + 1)]
+
+
+def test_job_runs_every_repo_and_keeps_outcomes():
+    def run(repo, context):
+        if repo["id"] == 2:
+            raise RuntimeError("boom")
+        return "success", None, {"seen": context}
+
+    job = SyncJobManager(max_workers=2).submit(repos(3), run, prepare=lambda repos: "ctx")
+    state = wait_done(job)
+    assert state["counts"] == {"success": 2, "error": 1}
+    assert {e["repo_id"]: e["message"] for e in state["repos"]}[2] == "boom"
+    assert all(e.get("seen") == "ctx" for e in state["repos"] if e["status"] == "success")
+
+
+def test_done_only_after_on_complete():
+    release = threading.Event()
+
+    def on_complete(job):
+        release.wait(5)
+        job.email_status = "sent"
+
+    job = SyncJobManager(max_workers=2).submit(repos(2), lambda r, c: ("success", None, {}), on_complete=on_complete)
+    deadline = time.time() + 5
+    while any(e["status"] != "success" for e in job.to_dict()["repos"]):
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert job.to_dict()["state"] == "running"
+    release.set()
+    state = wait_done(job)
+    assert state["email_status"] == "sent"
+    assert state["finished_at"] is not None
+
+
+def test_on_complete_errors_are_recorded():
+    def on_complete(job):
+        raise RuntimeError("smtp down")
+
+    job = SyncJobManager().submit(repos(1), lambda r, c: ("success", None, {}), on_complete=on_complete)
+    assert wait_done(job)["email_status"] == "error: smtp down"
+
+
+def test_empty_job_is_done_straight_away():
+    calls = []
+    job = SyncJobManager().submit([], lambda r, c: None, on_complete=calls.append)
+    assert job.done and calls == [job]
@@ -0,0 +1,68 @@
+"""
+Import-time budget check for the agent module.
+
+Imports agent.py in a fresh interpreter with no LLM/SMTP credentials and
+fails if the import takes longer than the budget or pulls in the heavy
+LLM / graph libraries, which should only load on first use.
+
+    python tools/check_import_time.py [--budget-ms 500]
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "500"))
+# must not be imported by `import agent` alone
+LAZY_MODULES = ("langchain_groq", "langgraph", "langchain_core")
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import agent
+elapsed = (time.perf_counter() - t0) * 1000
+loaded = sorted({m.split('.')[0] for m in sys.modules} & set(%r))
+print(json.dumps({"ms": elapsed, "loaded": loaded}))
+""" % (LAZY_MODULES,)
+
+
+def measure(runs: int = 3) -> dict:
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("GROQ_API_KEY", "SMTP_HOST", "SMTP_PORT", "SMTP_USER", "SMTP_PASS")}
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+            capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            print(out.stderr.strip())
+            sys.exit("FAIL: import agent raised")
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    # best of N smooths out a cold disk cache
+    return min(results, key=lambda r: r["ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    print(f"import agent: {result['ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    ok = True
+    if result["ms"] > args.budget_ms:
+        print("FAIL: import is over budget")
+        ok = False
+    if result["loaded"]:
+        print(f"FAIL: eagerly imported {', '.join(result['loaded'])}")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()